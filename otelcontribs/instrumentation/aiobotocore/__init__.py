@@ -1,12 +1,51 @@
+from aiobotocore.args import (  # pylint: disable=import-error
+    AioClientArgsCreator,
+)
 from aiobotocore.client import (  # pylint: disable=import-error
     AioBaseClient,
 )
+from aiobotocore.credentials import (  # pylint: disable=import-error
+    AioCredentialResolver,
+    AioRefreshableCredentials,
+)
 from aiobotocore.endpoint import (  # pylint: disable=import-error
     AioEndpoint,
 )
+from aiobotocore.httpsession import (  # pylint: disable=import-error
+    AIOHTTPSession,
+)
+from aiobotocore.paginate import (  # pylint: disable=import-error
+    AioPageIterator,
+)
+from aiobotocore.response import (  # pylint: disable=import-error
+    StreamingBody,
+)
+from aiobotocore.session import (  # pylint: disable=import-error
+    AioSession,
+)
+from aiobotocore.waiter import (  # pylint: disable=import-error
+    AIOWaiter,
+)
+from aiohttp import (
+    ClientSession,
+)
+from botocore.args import (
+    ClientArgsCreator,
+)
+from botocore.awsrequest import (
+    AWSPreparedRequest,
+    AWSRequest,
+)
+from botocore.client import (
+    ClientCreator,
+)
 from botocore.exceptions import (
     ClientError,
 )
+from contextvars import (
+    ContextVar,
+)
+import logging
 from opentelemetry import (
     context as context_api,
 )
@@ -21,33 +60,134 @@ from opentelemetry.instrumentation.botocore import (
     BotocoreInstrumentor,
 )
 from opentelemetry.instrumentation.botocore.extensions import (
-    _find_extension,
+    _KNOWN_EXTENSIONS,
+)
+from opentelemetry.instrumentation.botocore.extensions.types import (
+    _AwsSdkCallContext,
+    _AwsSdkExtension,
 )
 from opentelemetry.instrumentation.utils import (
     unwrap,
 )
+from opentelemetry.metrics import (
+    CallbackOptions,
+    get_meter,
+    Observation,
+)
+from opentelemetry.propagate import (
+    inject,
+)
+from opentelemetry.propagators.textmap import (
+    TextMapPropagator,
+)
 from opentelemetry.semconv.trace import (
     SpanAttributes,
 )
+from opentelemetry.trace import (
+    get_tracer,
+    set_span_in_context,
+    Span,
+    SpanKind,
+    Status,
+    StatusCode,
+    use_span,
+)
 from opentelemetry.util.types import (
-    Attributes,
+    AttributeValue,
+)
+from otelcontribs.instrumentation.aiobotocore.batch import (
+    _BATCH_OPERATIONS,
+    _BatchOperation,
+)
+from otelcontribs.instrumentation.aiobotocore.client_creation import (
+    _CLIENT_CREATION_PHASES,
+    _get_client_attributes,
+    _time_client_creation_phase,
+    _traced_create_client,
+)
+from otelcontribs.instrumentation.aiobotocore.credentials import (
+    _traced_credentials_load,
+    _traced_credentials_refresh,
+)
+from otelcontribs.instrumentation.aiobotocore.dynamodb import (
+    _COUNTED_OPERATIONS,
+    _get_consumed_capacity,
+    _TABLE_NAME,
+)
+from otelcontribs.instrumentation.aiobotocore.http_phases import (
+    _create_http_trace_config,
+)
+from otelcontribs.instrumentation.aiobotocore.in_flight import (
+    _get_in_flight_attributes,
+    _InFlight,
+)
+from otelcontribs.instrumentation.aiobotocore.messaging import (
+    _inject_message_attributes,
+    _MESSAGE_OPERATIONS,
+)
+from otelcontribs.instrumentation.aiobotocore.multipart import (
+    _CREATE_OPERATION,
+    _MULTIPART_OPERATIONS,
+    _MultipartUpload,
+    _MultipartUploads,
+    _PART_OPERATIONS,
 )
 from otelcontribs.instrumentation.aiobotocore.package import (
     INSTRUMENTS,
 )
+from otelcontribs.instrumentation.aiobotocore.sampling import (
+    _create_unsampled_span,
+    _match_sampling_rule,
+    _parse_sampling_rules,
+    _SamplingRule,
+)
+from otelcontribs.instrumentation.aiobotocore.streaming import (
+    _TracedStreamingBody,
+)
+from otelcontribs.instrumentation.aiobotocore.throttling import (
+    _get_throttle_key,
+    _ThrottleKey,
+    _Throttles,
+    _THROTTLING_ERROR_CODES,
+)
 from otelcontribs.instrumentation.aiobotocore.version import (
     VERSION,
 )
+from otelcontribs.instrumentation.aiobotocore.waiter import (
+    _traced_wait,
+    _Wait,
+    _WAIT,
+)
+from time import (
+    time_ns,
+)
+from timeit import (
+    default_timer,
+)
 from typing import (
     Any,
+    AsyncGenerator,
+    AsyncIterator,
     Callable,
     Collection,
     Coroutine,
+    Iterable,
+    Iterator,
+)
+from weakref import (
+    WeakKeyDictionary,
 )
 from wrapt import (
     wrap_function_wrapper,
 )
 
+_logger = logging.getLogger(__name__)
+
+# State of the API call currently awaited
+_CALL: ContextVar["_Call | None"] = ContextVar(
+    "otelcontribs_aiobotocore_call", default=None
+)
+
 
 class AiobotocoreInstrumentor(BotocoreInstrumentor):
     """An instrumentor for aiobotocore."""
@@ -55,13 +195,152 @@ class AiobotocoreInstrumentor(BotocoreInstrumentor):
     def instrumentation_dependencies(self) -> Collection[str]:
         return INSTRUMENTS
 
+    def _init_instrument(self, name: str, version: str, **kwargs: Any) -> None:
+        # pylint: disable=attribute-defined-outside-init
+        self._tracer = get_tracer(
+            name,
+            version,
+            kwargs.get("tracer_provider"),
+            schema_url="https://opentelemetry.io/schemas/1.11.0",
+        )
+
+        self.request_hook = kwargs.get("request_hook")
+        self.response_hook = kwargs.get("response_hook")
+
+        # When no propagator is given the global one is used
+        self.propagator: TextMapPropagator | None = kwargs.get("propagator")
+
+        self._sampling_rules = _parse_sampling_rules(
+            kwargs.get("sampling_rules")
+        )
+        self._call_metadata: WeakKeyDictionary[
+            AioBaseClient, dict[str, _CallMetadata]
+        ] = WeakKeyDictionary()
+
+        meter = get_meter(name, version, kwargs.get("meter_provider"))
+        self._duration_histogram = meter.create_histogram(
+            "rpc.client.duration",
+            unit="ms",
+            description="Duration of AWS API calls",
+        )
+        self._requests_counter = meter.create_counter(
+            "rpc.client.requests",
+            unit="{request}",
+            description="Number of AWS API calls",
+        )
+        self._errors_counter = meter.create_counter(
+            "rpc.client.errors",
+            unit="{error}",
+            description="Number of failed AWS API calls",
+        )
+
+        self._request_bytes_histogram = meter.create_histogram(
+            "rpc.client.request.size",
+            unit="By",
+            description="Size of the body of AWS API requests",
+        )
+        self._response_bytes_histogram = meter.create_histogram(
+            "rpc.client.response.size",
+            unit="By",
+            description="Size of the body of AWS API responses",
+        )
+
+        self._batch_size_histogram = meter.create_histogram(
+            "aws.batch.size",
+            unit="{entry}",
+            description="Number of entries sent in AWS batch calls",
+        )
+        self._batch_failed_histogram = meter.create_histogram(
+            "aws.batch.failed",
+            unit="{entry}",
+            description="Number of failed or unprocessed entries of AWS batch "
+            "calls",
+        )
+        self._batch_bytes_histogram = meter.create_histogram(
+            "aws.batch.bytes",
+            unit="By",
+            description="Size of the messages sent in AWS batch calls",
+        )
+
+        self._consumed_capacity_histogram = meter.create_histogram(
+            "aws.dynamodb.consumed_capacity",
+            unit="{capacity_unit}",
+            description="Capacity units consumed by DynamoDB calls, when "
+            "returned",
+        )
+        self._count_histogram = meter.create_histogram(
+            "aws.dynamodb.count",
+            unit="{item}",
+            description="Number of items returned by DynamoDB queries and "
+            "scans",
+        )
+        self._scanned_count_histogram = meter.create_histogram(
+            "aws.dynamodb.scanned_count",
+            unit="{item}",
+            description="Number of items evaluated by DynamoDB queries and "
+            "scans, before applying their filter expression",
+        )
+
+        self.client_creation_spans = kwargs.get("client_creation_spans", False)
+        self._clients_counter = meter.create_counter(
+            "aws.client.created",
+            unit="{client}",
+            description="Number of AWS clients created",
+        )
+
+        self._credentials_histogram = meter.create_histogram(
+            "aws.credentials.duration",
+            unit="ms",
+            description="Duration of the loading and refreshing of AWS "
+            "credentials",
+        )
+
+        self.throttle_hook = kwargs.get("throttle_hook")
+        self._throttles = _Throttles(kwargs.get("throttle_window", 60.0))
+        meter.create_observable_gauge(
+            "aws.throttles",
+            callbacks=[self._observe_throttles],
+            unit="{throttle}",
+            description="Throttled AWS API attempts in the sliding window",
+        )
+
+        self._in_flight = _InFlight()
+        self._active_counter = meter.create_up_down_counter(
+            "rpc.client.active_requests",
+            unit="{request}",
+            description="Number of AWS API calls in flight",
+        )
+        meter.create_observable_gauge(
+            "rpc.client.active_requests.peak",
+            callbacks=[self._observe_in_flight_peaks],
+            unit="{request}",
+            description="Peak number of AWS API calls in flight since the "
+            "last collection",
+        )
+
+        self.streaming_body_spans = kwargs.get("streaming_body_spans", False)
+        self.waiter_poll_spans = kwargs.get("waiter_poll_spans", True)
+        self._uploads = _MultipartUploads()
+
+        self._http_trace_config = None
+        if kwargs.get("http_phase_timings"):
+            self._http_trace_config = _create_http_trace_config(
+                meter.create_histogram(
+                    "aws.http.phase.duration",
+                    unit="ms",
+                    description="Duration of the HTTP phases of AWS API "
+                    "requests",
+                ),
+                _get_call_attributes,
+            )
+
     def _instrument(self, **kwargs: Any) -> None:
         self._init_instrument(__name__, VERSION, **kwargs)
 
         wrap_function_wrapper(
             "aiobotocore.client",
             "AioBaseClient._make_api_call",
-            self._patched_api_call,
+            self._patched_async_api_call,
         )
 
         wrap_function_wrapper(
@@ -70,9 +349,234 @@ class AiobotocoreInstrumentor(BotocoreInstrumentor):
             self._patched_endpoint_prepare_request,
         )
 
+        wrap_function_wrapper(
+            "aiobotocore.endpoint",
+            "AioEndpoint._get_response",
+            self._patched_endpoint_get_response,
+        )
+
+        wrap_function_wrapper(
+            "aiobotocore.endpoint",
+            "AioEndpoint._needs_retry",
+            _patched_endpoint_needs_retry,
+        )
+
+        wrap_function_wrapper(
+            "aiobotocore.paginate",
+            "AioPageIterator.__aiter__",
+            self._patched_page_iterator_aiter,
+        )
+
+        wrap_function_wrapper(
+            "aiobotocore.credentials",
+            "AioCredentialResolver.load_credentials",
+            self._patched_credential_resolver_load,
+        )
+
+        wrap_function_wrapper(
+            "aiobotocore.credentials",
+            "AioRefreshableCredentials._protected_refresh",
+            self._patched_credentials_refresh,
+        )
+
+        wrap_function_wrapper(
+            "aiobotocore.waiter",
+            "AIOWaiter.wait",
+            self._patched_waiter_wait,
+        )
+
+        wrap_function_wrapper(
+            "aiobotocore.session",
+            "AioSession._create_client",
+            self._patched_session_create_client,
+        )
+
+        if self.client_creation_spans:
+            for module, name, phase in _CLIENT_CREATION_PHASES:
+                wrap_function_wrapper(
+                    module, name, _time_client_creation_phase(phase)
+                )
+
+        if self._http_trace_config is not None:
+            wrap_function_wrapper(
+                "aiobotocore.httpsession",
+                "AIOHTTPSession.__aenter__",
+                self._patched_http_session_aenter,
+            )
+
     def _uninstrument(self, **kwargs: None) -> None:
         unwrap(AioBaseClient, "_make_api_call")
         unwrap(AioEndpoint, "prepare_request")
+        unwrap(AioEndpoint, "_get_response")
+        unwrap(AioEndpoint, "_needs_retry")
+        unwrap(AIOHTTPSession, "__aenter__")
+        unwrap(AioPageIterator, "__aiter__")
+        unwrap(AIOWaiter, "wait")
+        unwrap(AioCredentialResolver, "load_credentials")
+        unwrap(AioSession, "_create_client")
+        unwrap(ClientCreator, "_load_service_model")
+        unwrap(ClientCreator, "_load_service_endpoints_ruleset")
+        unwrap(ClientArgsCreator, "_compute_endpoint_config")
+        unwrap(AioClientArgsCreator, "_build_endpoint_resolver")
+        unwrap(AioRefreshableCredentials, "_protected_refresh")
+
+    def _patched_endpoint_prepare_request(
+        self,
+        wrapped: Callable[..., Any],
+        _instance: AioEndpoint,
+        args: tuple[AWSRequest],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        request = args[0]
+        if self.propagator is None:
+            inject(request.headers)
+        else:
+            self.propagator.inject(request.headers)
+
+        prepared = wrapped(*args, **kwargs)
+        call = _CALL.get()
+        if call is not None:
+            call.request_size = _get_body_size(prepared)
+        return prepared
+
+    async def _patched_http_session_aenter(
+        self,
+        wrapped: Callable[..., Coroutine],
+        instance: AIOHTTPSession,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        result = await wrapped(*args, **kwargs)
+        # pylint: disable=protected-access
+        session: ClientSession | None = instance._session
+        if session is not None and self._http_trace_config is not None:
+            session.trace_configs.append(self._http_trace_config)
+        return result
+
+    def _patched_page_iterator_aiter(
+        self,
+        wrapped: Callable[..., AsyncIterator[Any]],
+        instance: AioPageIterator,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> AsyncIterator[Any]:
+        pages = wrapped(*args, **kwargs)
+        if context_api.get_value(_SUPPRESS_INSTRUMENTATION_KEY):
+            return pages
+        return self._traced_pages(instance, pages)
+
+    async def _traced_pages(
+        self,
+        page_iterator: AioPageIterator,
+        pages: AsyncIterator[Any],
+    ) -> AsyncGenerator[Any, None]:
+        # pylint: disable=protected-access
+        method = page_iterator._method
+        meta = method.__self__.meta
+        service_id = meta.service_model.service_id
+        operation = meta.method_to_api_mapping.get(
+            method.__name__, method.__name__
+        )
+        result_key = page_iterator.result_keys[0]
+
+        span = self._tracer.start_span(
+            f"{service_id}.{operation} paginate",
+            kind=SpanKind.INTERNAL,
+            attributes={
+                SpanAttributes.RPC_SYSTEM: "aws-api",
+                SpanAttributes.RPC_SERVICE: service_id,
+                SpanAttributes.RPC_METHOD: operation,
+            },
+        )
+        page_count = 0
+        item_count = 0
+        size = 0
+        # Time spent awaiting AWS versus processing pages in the consumer
+        fetch_time = 0.0
+        consumer_time = 0.0
+        try:
+            while True:
+                start = default_timer()
+                # The span is only current while fetching, so that the page
+                # calls are its children but the consumer code is not
+                with use_span(span):
+                    try:
+                        page = await pages.__anext__()
+                    except StopAsyncIteration:
+                        break
+                yielded = default_timer()
+                fetch_time += yielded - start
+
+                page_count += 1
+                item_count += len(result_key.search(page) or ())
+                size += _get_content_length(page)
+
+                yield page
+                consumer_time += default_timer() - yielded
+        finally:
+            span.set_attributes(
+                {
+                    "aws.pagination.pages": page_count,
+                    "aws.pagination.items": item_count,
+                    "aws.pagination.bytes": size,
+                    "aws.pagination.fetch_ms": fetch_time * 1000,
+                    "aws.pagination.consumer_ms": consumer_time * 1000,
+                }
+            )
+            span.end()
+            # Closes the pages of aiobotocore, an async generator, right away
+            aclose = getattr(pages, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _patched_waiter_wait(
+        self,
+        wrapped: Callable[..., Coroutine],
+        instance: AIOWaiter | None,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        if context_api.get_value(_SUPPRESS_INSTRUMENTATION_KEY):
+            return await wrapped(*args, **kwargs)
+
+        # Documented waiters call the method on the class with the waiter
+        waiter: AIOWaiter = args[0] if instance is None else instance
+        return await _traced_wait(
+            self._tracer,
+            waiter,
+            self.waiter_poll_spans,
+            wrapped,
+            args,
+            kwargs,
+        )
+
+    async def _poll(
+        self,
+        wait: _Wait,
+        original_func: Callable[..., Coroutine],
+        instance: AioBaseClient,
+        args: tuple[str, dict[str, Any]],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        start = default_timer()
+        token = _WAIT.set(None)
+        try:
+            if wait.poll_spans:
+                return await self._patched_async_api_call(
+                    original_func, instance, args, kwargs
+                )
+
+            suppress_token = context_api.attach(
+                context_api.set_value(_SUPPRESS_INSTRUMENTATION_KEY, True)
+            )
+            try:
+                return await original_func(*args, **kwargs)
+            finally:
+                context_api.detach(suppress_token)
+        finally:
+            _WAIT.reset(token)
+            wait.polls += 1
+            wait.poll_time += default_timer() - start
 
     async def _patched_async_api_call(
         self,
@@ -81,53 +585,669 @@ class AiobotocoreInstrumentor(BotocoreInstrumentor):
         args: tuple[str, dict[str, Any]],
         kwargs: dict[str, Any],
     ) -> Any:
+        # The calls made within a wait are the polls of its waiter
+        wait = _WAIT.get()
+        if wait is not None:
+            return await self._poll(
+                wait, original_func, instance, args, kwargs
+            )
+
         if context_api.get_value(_SUPPRESS_INSTRUMENTATION_KEY):
             return await original_func(*args, **kwargs)
 
-        call_context = _determine_call_context(instance, args)
-        if call_context is None:
+        metadata = self._get_call_metadata(instance, args[0])
+        if metadata is None:
             return await original_func(*args, **kwargs)
 
-        extension = _find_extension(call_context)
+        call_context = metadata.create_call_context(args)
+        extension = metadata.create_extension(call_context)
         if not extension.should_trace_service_call():
             return await original_func(*args, **kwargs)
 
-        attributes: Attributes = {
-            SpanAttributes.RPC_SYSTEM: "aws-api",
-            SpanAttributes.RPC_SERVICE: call_context.service_id,
-            SpanAttributes.RPC_METHOD: call_context.operation,
-            "aws.region": str(call_context.region),
-        }
+        metric_attributes = dict(metadata.metric_attributes)
+
+        # Calls of a multipart upload are grouped under its span
+        upload = None
+        parent_context = None
+        if metadata.multipart:
+            upload = self._uploads.get(call_context.params.get("UploadId"))
+            if upload is None:
+                parent_context = context_api.get_current()
+            else:
+                parent_context = set_span_in_context(upload.span)
 
-        _safe_invoke(extension.extract_attributes, attributes)
+        # Calls dropped by their sampling rule are neither given to the
+        # sampler nor recorded, but still measured
+        rule = metadata.sampling_rule
+        if rule is None or rule.should_sample():
+            span_manager = self._tracer.start_as_current_span(
+                call_context.span_name,
+                context=parent_context,
+                kind=call_context.span_kind,
+                attributes=metric_attributes,
+            )
+        else:
+            span_manager = use_span(_create_unsampled_span(parent_context))
+
+        start = default_timer()
+        with span_manager as span:
+            # Extensions may serialize request parameters into attributes,
+            # which is only worth it when the span is recorded
+            if span.is_recording():
+                attributes: dict[str, AttributeValue] = {}
+                _safe_invoke(extension.extract_attributes, attributes)
+                span.set_attributes(attributes)
+                # and may name the span after the request parameters
+                span.update_name(call_context.span_name)
 
-        with self._tracer.start_as_current_span(
-            call_context.span_name,
-            kind=call_context.span_kind,
-            attributes=attributes,
-        ) as span:
             _safe_invoke(extension.before_service_call, span)
+            if metadata.messages is not None:
+                _safe_invoke(
+                    _inject_message_attributes,
+                    metadata.messages,
+                    call_context.params,
+                    self.propagator,
+                )
             self._call_request_hook(span, call_context)
 
             token = context_api.attach(
                 context_api.set_value(_SUPPRESS_HTTP_INSTRUMENTATION_KEY, True)
             )
 
+            call = _Call(_get_throttle_key(call_context), span.is_recording())
+            call_token = _CALL.set(call)
+
+            in_flight_key = metadata.in_flight_key
+            in_flight_attributes = metadata.in_flight_attributes
+            self._in_flight.start(in_flight_key)
+            self._active_counter.add(1, in_flight_attributes)
+            if (
+                upload is not None
+                and call_context.operation in _PART_OPERATIONS
+            ):
+                _safe_invoke(upload.part_started, call_context.params)
+
             result = None
+            exception: Exception | None = None
             try:
                 result = await original_func(*args, **kwargs)
             except ClientError as error:
+                exception = error
                 result = getattr(error, "response", None)
                 _apply_response_attributes(span, result)
                 _safe_invoke(extension.on_error, span, error)
                 raise
+            except Exception as error:
+                exception = error
+                raise
             else:
                 _apply_response_attributes(span, result)
                 _safe_invoke(extension.on_success, span, result)
+                if self.streaming_body_spans and span.is_recording():
+                    self._trace_streaming_body(span, call_context, result)
             finally:
+                self._in_flight.end(in_flight_key)
+                self._active_counter.add(-1, in_flight_attributes)
+                _CALL.reset(call_token)
                 context_api.detach(token)
+                if call.attempts is not None:
+                    self._record_attempts(span, call_context, call.attempts)
                 _safe_invoke(extension.after_service_call)
 
                 self._call_response_hook(span, call_context, result)
+                duration = default_timer() - start
+                self._record_metrics(
+                    metric_attributes, result, exception, duration
+                )
+                self._record_payload_sizes(
+                    span, call.request_size, result, metric_attributes
+                )
+                if metadata.batch is not None:
+                    # The parameters are not validated when the call fails
+                    _safe_invoke(
+                        self._record_batch,
+                        span,
+                        metadata.batch,
+                        call_context.params,
+                        result,
+                        metric_attributes,
+                    )
+                if (
+                    metadata.dynamodb
+                    and exception is None
+                    and result is not None
+                ):
+                    self._record_dynamodb(
+                        span, call_context, result, metric_attributes
+                    )
+                if metadata.multipart:
+                    self._record_multipart_call(
+                        span,
+                        call_context,
+                        upload,
+                        parent_context,
+                        result if exception is None else None,
+                        duration,
+                    )
 
             return result
+
+    def _record_multipart_call(
+        self,
+        span: Span,
+        call_context: Any,
+        upload: _MultipartUpload | None,
+        parent_context: context_api.Context | None,
+        result: dict[str, Any] | None,
+        duration: float,
+    ) -> None:
+        operation = call_context.operation
+        params = call_context.params
+        if operation == _CREATE_OPERATION:
+            if result is None or not span.is_recording():
+                return
+            upload_span = self._tracer.start_span(
+                "S3.MultipartUpload",
+                context=parent_context,
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    SpanAttributes.RPC_SYSTEM: "aws-api",
+                    SpanAttributes.RPC_SERVICE: "S3",
+                    "aws.s3.bucket": str(params.get("Bucket")),
+                    "aws.s3.key": str(params.get("Key")),
+                    "aws.s3.upload_id": result["UploadId"],
+                },
+                start_time=getattr(span, "start_time", None),
+            )
+            self._uploads.start(result["UploadId"], upload_span)
+        elif upload is None:
+            return
+        elif operation in _PART_OPERATIONS:
+            upload.part_ended(params, duration, result is not None)
+        elif result is not None:
+            self._uploads.end(
+                params["UploadId"], operation == "CompleteMultipartUpload"
+            )
+
+    def _get_call_metadata(
+        self, client: AioBaseClient, operation: str
+    ) -> "_CallMetadata | None":
+        operations = self._call_metadata.get(client)
+        if operations is None:
+            operations = self._call_metadata[client] = {}
+
+        metadata = operations.get(operation)
+        if metadata is None:
+            call_context = _determine_call_context(client, (operation, {}))
+            if call_context is None:
+                return None
+            metadata = operations[operation] = _CallMetadata(
+                call_context, self._sampling_rules
+            )
+        return metadata
+
+    def _trace_streaming_body(
+        self, span: Span, call_context: Any, result: dict[str, Any]
+    ) -> None:
+        body = result.get("Body")
+        if not isinstance(body, StreamingBody):
+            return
+
+        body_span = self._tracer.start_span(
+            f"{call_context.service_id}.{call_context.operation} body",
+            context=set_span_in_context(span),
+            kind=SpanKind.INTERNAL,
+        )
+        result["Body"] = _TracedStreamingBody(
+            body, body_span, result.get("ContentLength")
+        )
+
+    def _record_attempts(
+        self,
+        span: Span,
+        call_context: Any,
+        attempts: list["_Attempt"],
+    ) -> None:
+        # A single attempt is already fully described by the call span
+        if len(attempts) < 2:
+            return
+
+        parent = set_span_in_context(span)
+        name = f"{call_context.service_id}.{call_context.operation} attempt"
+        total_backoff = 0
+        for number, record in enumerate(attempts, start=1):
+            start, end, status_code, error_type, backoff = record
+            attributes: dict[str, AttributeValue] = {"aws.attempt": number}
+            if status_code is not None:
+                attributes[SpanAttributes.HTTP_STATUS_CODE] = status_code
+            if error_type is not None:
+                attributes["error.type"] = error_type
+            if backoff:
+                attributes["aws.retry.backoff_ms"] = backoff / 1e6
+                total_backoff += backoff
+
+            attempt_span = self._tracer.start_span(
+                name,
+                context=parent,
+                kind=SpanKind.INTERNAL,
+                attributes=attributes,
+                start_time=start,
+            )
+            if error_type is not None:
+                attempt_span.set_status(Status(StatusCode.ERROR))
+            attempt_span.end(end_time=end)
+
+        span.set_attribute("aws.retry.backoff_ms", total_backoff / 1e6)
+
+    async def _patched_session_create_client(
+        self,
+        wrapped: Callable[..., Coroutine],
+        _instance: AioSession,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        if context_api.get_value(_SUPPRESS_INSTRUMENTATION_KEY):
+            return await wrapped(*args, **kwargs)
+
+        if not self.client_creation_spans:
+            client = await wrapped(*args, **kwargs)
+            self._clients_counter.add(1, _get_client_attributes(client))
+            return client
+
+        return await _traced_create_client(
+            self._tracer, self._clients_counter, wrapped, args, kwargs
+        )
+
+    async def _patched_credential_resolver_load(
+        self,
+        wrapped: Callable[..., Coroutine],
+        _instance: AioCredentialResolver,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        if context_api.get_value(_SUPPRESS_INSTRUMENTATION_KEY):
+            return await wrapped(*args, **kwargs)
+
+        return await _traced_credentials_load(
+            self._tracer, self._credentials_histogram, wrapped, args, kwargs
+        )
+
+    async def _patched_credentials_refresh(
+        self,
+        wrapped: Callable[..., Coroutine],
+        instance: AioRefreshableCredentials,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        if context_api.get_value(_SUPPRESS_INSTRUMENTATION_KEY):
+            return await wrapped(*args, **kwargs)
+
+        return await _traced_credentials_refresh(
+            self._tracer,
+            self._credentials_histogram,
+            instance,
+            wrapped,
+            args,
+            kwargs,
+        )
+
+    async def _patched_endpoint_get_response(
+        self,
+        wrapped: Callable[..., Coroutine],
+        _instance: AioEndpoint,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        call = _CALL.get()
+        if call is None:
+            return await wrapped(*args, **kwargs)
+
+        start = time_ns()
+        success_response, exception = await wrapped(*args, **kwargs)
+        end = time_ns()
+
+        status_code = None
+        error_code = None
+        if success_response is not None:
+            http_response, parsed_response = success_response
+            status_code = http_response.status_code
+            error_code = parsed_response.get("Error", {}).get("Code")
+
+        if error_code in _THROTTLING_ERROR_CODES:
+            self._record_throttle(call.throttle_key)
+
+        if call.attempts is not None:
+            error_type = error_code
+            if exception is not None:
+                error_type = type(exception).__qualname__
+            call.attempts.append(
+                (start, end, status_code, error_type, call.backoff)
+            )
+            call.backoff = 0
+
+        return success_response, exception
+
+    def _record_throttle(self, key: _ThrottleKey) -> None:
+        count = self._throttles.add(key)
+        if callable(self.throttle_hook):
+            _safe_invoke(self.throttle_hook, *key, count)
+
+    def throttle_count(
+        self,
+        service: str,
+        operation: str,
+        resource: str | None = None,
+    ) -> int:
+        """Number of throttled attempts in the current sliding window.
+
+        ``service`` is the service id (e.g. ``DynamoDB``), ``operation`` the
+        operation name and ``resource`` the table name, queue URL or stream
+        name the calls were made on.
+        """
+        if not self.is_instrumented_by_opentelemetry:
+            return 0
+        return self._throttles.count((service, operation, resource))
+
+    def _observe_throttles(
+        self, _options: CallbackOptions
+    ) -> Iterable[Observation]:
+        for (service, operation, resource), count in self._throttles.counts():
+            attributes: dict[str, AttributeValue] = {
+                SpanAttributes.RPC_SERVICE: service,
+                SpanAttributes.RPC_METHOD: operation,
+            }
+            if resource is not None:
+                attributes["aws.resource"] = resource
+            yield Observation(count, attributes)
+
+    def _observe_in_flight_peaks(
+        self, _options: CallbackOptions
+    ) -> Iterable[Observation]:
+        for key, peak in self._in_flight.peaks():
+            yield Observation(peak, _get_in_flight_attributes(key))
+
+    def _record_batch(
+        self,
+        span: Span,
+        batch: _BatchOperation,
+        params: dict[str, Any],
+        result: dict[str, Any] | None,
+        attributes: dict[str, AttributeValue],
+    ) -> None:
+        span_attributes: dict[str, AttributeValue] = {}
+
+        size = batch.entries(params)
+        span_attributes["aws.batch.size"] = size
+        self._batch_size_histogram.record(size, attributes)
+
+        if batch.payload is not None:
+            payload = batch.payload(params)
+            span_attributes["aws.batch.bytes"] = payload
+            self._batch_bytes_histogram.record(payload, attributes)
+
+        # Failed calls have no per entry outcome
+        if result is not None and _get_status_code(result) == 200:
+            failed = batch.failed(result)
+            span_attributes["aws.batch.failed"] = failed
+            self._batch_failed_histogram.record(failed, attributes)
+
+        span.set_attributes(span_attributes)
+
+    def _record_dynamodb(
+        self,
+        span: Span,
+        call_context: _AwsSdkCallContext,
+        result: dict[str, Any],
+        metric_attributes: dict[str, AttributeValue],
+    ) -> None:
+        span_attributes: dict[str, AttributeValue] = {}
+        attributes: dict[str, AttributeValue] = {
+            SpanAttributes.RPC_METHOD: call_context.operation,
+            "aws.region": metric_attributes["aws.region"],
+        }
+
+        capacity = _get_consumed_capacity(result)
+        if capacity:
+            span_attributes["aws.dynamodb.consumed_capacity_units"] = sum(
+                capacity.values()
+            )
+            for table_name, units in capacity.items():
+                self._consumed_capacity_histogram.record(
+                    units, {**attributes, _TABLE_NAME: table_name}
+                )
+
+        request_table = call_context.params.get("TableName")
+        if isinstance(request_table, str):
+            attributes[_TABLE_NAME] = request_table
+
+        if call_context.operation in _COUNTED_OPERATIONS:
+            count = result.get("Count")
+            scanned_count = result.get("ScannedCount")
+            if count is not None and scanned_count is not None:
+                # The extension already sets them on Scan spans
+                if call_context.operation != "Scan":
+                    span_attributes[SpanAttributes.AWS_DYNAMODB_COUNT] = count
+                    span_attributes[
+                        SpanAttributes.AWS_DYNAMODB_SCANNED_COUNT
+                    ] = scanned_count
+                self._count_histogram.record(count, attributes)
+                self._scanned_count_histogram.record(scanned_count, attributes)
+
+        span.set_attributes(span_attributes)
+
+    def _record_payload_sizes(
+        self,
+        span: Span,
+        request_size: int | None,
+        result: dict[str, Any] | None,
+        attributes: dict[str, AttributeValue],
+    ) -> None:
+        span_attributes: dict[str, AttributeValue] = {}
+        if request_size is not None:
+            span_attributes[SpanAttributes.HTTP_REQUEST_CONTENT_LENGTH] = (
+                request_size
+            )
+            self._request_bytes_histogram.record(request_size, attributes)
+
+        # Read from the headers, the body of the response is not buffered
+        # for streaming operations
+        response_size = _get_content_length(result) if result else None
+        if response_size:
+            span_attributes[SpanAttributes.HTTP_RESPONSE_CONTENT_LENGTH] = (
+                response_size
+            )
+            self._response_bytes_histogram.record(response_size, attributes)
+
+        span.set_attributes(span_attributes)
+
+    def _record_metrics(
+        self,
+        attributes: dict[str, AttributeValue],
+        result: dict[str, Any] | None,
+        exception: Exception | None,
+        duration: float,
+    ) -> None:
+        status_code = _get_status_code(result)
+        if status_code is not None:
+            attributes[SpanAttributes.HTTP_STATUS_CODE] = status_code
+        if exception is not None:
+            attributes["error.type"] = _get_error_type(exception)
+
+        self._duration_histogram.record(duration * 1000, attributes)
+        self._requests_counter.add(1, attributes)
+        if exception is not None:
+            self._errors_counter.add(1, attributes)
+
+
+def _get_body_size(request: AWSPreparedRequest) -> int | None:
+    content_length = request.headers.get("Content-Length")
+    if content_length is not None:
+        try:
+            return int(content_length)
+        except ValueError:
+            return None
+
+    body = request.body
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    return None
+
+
+def _get_content_length(result: dict[str, Any]) -> int:
+    headers = result.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+    try:
+        return int(headers.get("content-length", 0))
+    except ValueError:
+        return 0
+
+
+def _get_status_code(result: dict[str, Any] | None) -> int | None:
+    if result is None:
+        return None
+
+    metadata = result.get("ResponseMetadata")
+    if metadata is None:
+        return None
+    return metadata.get("HTTPStatusCode")
+
+
+def _get_error_type(exception: Exception) -> str:
+    if isinstance(exception, ClientError):
+        code = exception.response.get("Error", {}).get("Code")
+        if code:
+            return str(code)
+    return type(exception).__qualname__
+
+
+class _CallMetadata:
+    """What is constant across the calls of one operation by one client."""
+
+    __slots__ = (
+        "call_context",
+        "extension_cls",
+        "metric_attributes",
+        "in_flight_key",
+        "in_flight_attributes",
+        "batch",
+        "dynamodb",
+        "messages",
+        "multipart",
+        "sampling_rule",
+    )
+
+    def __init__(
+        self,
+        call_context: _AwsSdkCallContext,
+        sampling_rules: tuple[_SamplingRule, ...],
+    ) -> None:
+        self.call_context = vars(call_context)
+        self.extension_cls = _get_extension_cls(call_context.service)
+        self.metric_attributes: dict[str, AttributeValue] = {
+            SpanAttributes.RPC_SYSTEM: "aws-api",
+            SpanAttributes.RPC_SERVICE: call_context.service_id,
+            SpanAttributes.RPC_METHOD: call_context.operation,
+            "aws.region": str(call_context.region),
+        }
+        self.in_flight_key = (
+            call_context.service_id,
+            str(call_context.region),
+        )
+        self.in_flight_attributes = _get_in_flight_attributes(
+            self.in_flight_key
+        )
+        self.batch = _BATCH_OPERATIONS.get(
+            (call_context.service_id, call_context.operation)
+        )
+        self.messages = _MESSAGE_OPERATIONS.get(
+            (call_context.service_id, call_context.operation)
+        )
+        self.sampling_rule = _match_sampling_rule(
+            sampling_rules, call_context.service_id, call_context.operation
+        )
+        self.dynamodb = call_context.service_id == "DynamoDB"
+        self.multipart = (
+            call_context.service_id == "S3"
+            and call_context.operation in _MULTIPART_OPERATIONS
+        )
+
+    def create_call_context(
+        self, args: tuple[str, dict[str, Any]]
+    ) -> _AwsSdkCallContext:
+        # Extensions may change the span name and kind of their call context,
+        # so every call gets its own copy
+        call_context: _AwsSdkCallContext = object.__new__(_AwsSdkCallContext)
+        vars(call_context).update(self.call_context)
+        call_context.params = args[1] if len(args) > 1 else {}
+        return call_context
+
+    def create_extension(
+        self, call_context: _AwsSdkCallContext
+    ) -> _AwsSdkExtension:
+        try:
+            return self.extension_cls(call_context)
+        except Exception:  # pylint: disable=broad-except
+            _logger.exception("Error when creating extension")
+            return _AwsSdkExtension(call_context)
+
+
+def _get_extension_cls(service: str) -> type[_AwsSdkExtension]:
+    loader = _KNOWN_EXTENSIONS.get(service)
+    if loader is None:
+        return _AwsSdkExtension
+    try:
+        return loader() or _AwsSdkExtension
+    except Exception:  # pylint: disable=broad-except
+        _logger.exception("Error when loading extension")
+        return _AwsSdkExtension
+
+
+_Attempt = tuple[int, int, int | None, str | None, int]
+
+
+class _Call:
+    """State of one API call shared with the endpoint it is sent through."""
+
+    __slots__ = ("throttle_key", "attempts", "backoff", "request_size")
+
+    def __init__(self, throttle_key: _ThrottleKey, recording: bool) -> None:
+        self.throttle_key = throttle_key
+        # (start_ns, end_ns, status code, error type, backoff_ns) of every
+        # attempt, only kept while the call span is recording
+        self.attempts: list[_Attempt] | None = [] if recording else None
+        # Time slept before the next attempt
+        self.backoff = 0
+        # Body size of the request sent, once prepared
+        self.request_size: int | None = None
+
+
+def _get_call_attributes() -> dict[str, AttributeValue]:
+    call = _CALL.get()
+    if call is None:
+        return {}
+    return {
+        SpanAttributes.RPC_SERVICE: call.throttle_key[0],
+        SpanAttributes.RPC_METHOD: call.throttle_key[1],
+    }
+
+
+async def _patched_endpoint_needs_retry(
+    wrapped: Callable[..., Coroutine],
+    _instance: AioEndpoint,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Any:
+    call = _CALL.get()
+    if call is None or call.attempts is None:
+        return await wrapped(*args, **kwargs)
+
+    # The retry handler sleeps here before returning True
+    start = time_ns()
+    needs_retry = await wrapped(*args, **kwargs)
+    if needs_retry:
+        call.backoff = time_ns() - start
+
+    return needs_retry
@@ -0,0 +1,104 @@
+from typing import (
+    Any,
+    Callable,
+)
+
+_Counter = Callable[[dict[str, Any]], int]
+
+
+class _BatchOperation:
+    """How to count the entries of a batch operation.
+
+    ``entries`` counts the entries sent from the request parameters,
+    ``failed`` the failed or unprocessed entries from the response and
+    ``payload``, when the entries carry a message, their size in bytes.
+    """
+
+    __slots__ = ("entries", "failed", "payload")
+
+    def __init__(
+        self,
+        entries: _Counter,
+        failed: _Counter,
+        payload: _Counter | None = None,
+    ) -> None:
+        self.entries = entries
+        self.failed = failed
+        self.payload = payload
+
+
+def _count(key: str) -> _Counter:
+    def count(value: dict[str, Any]) -> int:
+        return len(value.get(key) or ())
+
+    return count
+
+
+def _count_per_table(key: str, items_key: str | None = None) -> _Counter:
+    def count(value: dict[str, Any]) -> int:
+        tables = value.get(key) or {}
+        if items_key is None:
+            return sum(len(items) for items in tables.values())
+        return sum(len(items.get(items_key, ())) for items in tables.values())
+
+    return count
+
+
+def _get_int(key: str) -> _Counter:
+    def get(value: dict[str, Any]) -> int:
+        return int(value.get(key) or 0)
+
+    return get
+
+
+def _payload_size(key: str, body_key: str) -> _Counter:
+    def size(value: dict[str, Any]) -> int:
+        total = 0
+        for entry in value.get(key) or ():
+            body = entry.get(body_key)
+            if isinstance(body, str):
+                total += len(body.encode("utf-8"))
+            elif isinstance(body, (bytes, bytearray)):
+                total += len(body)
+        return total
+
+    return size
+
+
+# Keyed by service id and operation name
+_BATCH_OPERATIONS: dict[tuple[str, str], _BatchOperation] = {
+    ("SQS", "SendMessageBatch"): _BatchOperation(
+        _count("Entries"),
+        _count("Failed"),
+        _payload_size("Entries", "MessageBody"),
+    ),
+    ("SQS", "DeleteMessageBatch"): _BatchOperation(
+        _count("Entries"), _count("Failed")
+    ),
+    ("SQS", "ChangeMessageVisibilityBatch"): _BatchOperation(
+        _count("Entries"), _count("Failed")
+    ),
+    ("SNS", "PublishBatch"): _BatchOperation(
+        _count("PublishBatchRequestEntries"),
+        _count("Failed"),
+        _payload_size("PublishBatchRequestEntries", "Message"),
+    ),
+    ("DynamoDB", "BatchWriteItem"): _BatchOperation(
+        _count_per_table("RequestItems"),
+        _count_per_table("UnprocessedItems"),
+    ),
+    ("DynamoDB", "BatchGetItem"): _BatchOperation(
+        _count_per_table("RequestItems", "Keys"),
+        _count_per_table("UnprocessedKeys", "Keys"),
+    ),
+    ("Kinesis", "PutRecords"): _BatchOperation(
+        _count("Records"),
+        _get_int("FailedRecordCount"),
+        _payload_size("Records", "Data"),
+    ),
+    ("Firehose", "PutRecordBatch"): _BatchOperation(
+        _count("Records"),
+        _get_int("FailedPutCount"),
+        _payload_size("Records", "Data"),
+    ),
+}
@@ -0,0 +1,117 @@
+from aiobotocore.client import (  # pylint: disable=import-error
+    AioBaseClient,
+)
+from contextvars import (
+    ContextVar,
+)
+from opentelemetry.metrics import (
+    Counter,
+)
+from opentelemetry.semconv.trace import (
+    SpanAttributes,
+)
+from opentelemetry.trace import (
+    SpanKind,
+    Tracer,
+)
+from opentelemetry.util.types import (
+    AttributeValue,
+)
+from timeit import (
+    default_timer,
+)
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+)
+
+# Time spent in each phase of the client creation currently awaited
+_CLIENT_CREATION: ContextVar[dict[str, float] | None] = ContextVar(
+    "otelcontribs_aiobotocore_client_creation", default=None
+)
+
+# The methods of the client creation timed, by phase
+_CLIENT_CREATION_PHASES = (
+    ("botocore.client", "ClientCreator._load_service_model", "model_load"),
+    (
+        "botocore.client",
+        "ClientCreator._load_service_endpoints_ruleset",
+        "model_load",
+    ),
+    (
+        "botocore.args",
+        "ClientArgsCreator._compute_endpoint_config",
+        "endpoint_resolution",
+    ),
+    (
+        "aiobotocore.args",
+        "AioClientArgsCreator._build_endpoint_resolver",
+        "endpoint_resolution",
+    ),
+)
+
+
+def _time_client_creation_phase(phase: str) -> Callable[..., Any]:
+    def timed(
+        wrapped: Callable[..., Any],
+        _instance: Any,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        durations = _CLIENT_CREATION.get()
+        if durations is None:
+            return wrapped(*args, **kwargs)
+
+        start = default_timer()
+        try:
+            return wrapped(*args, **kwargs)
+        finally:
+            durations[phase] = (
+                durations.get(phase, 0.0) + default_timer() - start
+            )
+
+    return timed
+
+
+def _get_client_attributes(client: AioBaseClient) -> dict[str, AttributeValue]:
+    meta = client.meta
+    return {
+        SpanAttributes.RPC_SERVICE: meta.service_model.service_id,
+        "aws.region": str(meta.region_name),
+    }
+
+
+async def _traced_create_client(
+    tracer: Tracer,
+    counter: Counter,
+    wrapped: Callable[..., Coroutine],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Any:
+    """Await the creation of a client in an ``AWS client create`` span.
+
+    The phases timed meanwhile add their durations to ``_CLIENT_CREATION``.
+    """
+    durations: dict[str, float] = {}
+    with tracer.start_as_current_span(
+        "AWS client create",
+        kind=SpanKind.INTERNAL,
+        attributes={SpanAttributes.RPC_SYSTEM: "aws-api"},
+    ) as span:
+        token = _CLIENT_CREATION.set(durations)
+        try:
+            client = await wrapped(*args, **kwargs)
+        finally:
+            _CLIENT_CREATION.reset(token)
+            span.set_attributes(
+                {
+                    f"aws.client.{phase}_ms": duration * 1000
+                    for phase, duration in durations.items()
+                }
+            )
+
+        attributes = _get_client_attributes(client)
+        span.set_attributes(attributes)
+        counter.add(1, attributes)
+        return client
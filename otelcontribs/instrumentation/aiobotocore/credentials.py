@@ -0,0 +1,96 @@
+from aiobotocore.credentials import (  # pylint: disable=import-error
+    AioRefreshableCredentials,
+)
+from contextlib import (
+    contextmanager,
+)
+from opentelemetry import (
+    context as context_api,
+)
+from opentelemetry.metrics import (
+    Histogram,
+)
+from opentelemetry.trace import (
+    get_current_span,
+    Link,
+    SpanKind,
+    Tracer,
+)
+from opentelemetry.util.types import (
+    AttributeValue,
+)
+from timeit import (
+    default_timer,
+)
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Iterator,
+)
+
+
+@contextmanager
+def _credentials_span(
+    tracer: Tracer, histogram: Histogram, operation: str
+) -> Iterator[dict[str, AttributeValue]]:
+    # Credentials are shared by the calls of a client, so loading them
+    # is a trace of its own, linked to the call that triggered it
+    trigger = get_current_span().get_span_context()
+    attributes: dict[str, AttributeValue] = {
+        "aws.credentials.operation": operation
+    }
+    start = default_timer()
+    with tracer.start_as_current_span(
+        f"AWS credentials {operation}",
+        context=context_api.Context(),
+        kind=SpanKind.INTERNAL,
+        links=[Link(trigger)] if trigger.is_valid else None,
+    ) as span:
+        try:
+            yield attributes
+        finally:
+            span.set_attributes(attributes)
+            histogram.record((default_timer() - start) * 1000, attributes)
+
+
+async def _traced_credentials_load(
+    tracer: Tracer,
+    histogram: Histogram,
+    wrapped: Callable[..., Coroutine],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Any:
+    credentials = None
+    with _credentials_span(tracer, histogram, "load") as attributes:
+        try:
+            credentials = await wrapped(*args, **kwargs)
+            return credentials
+        finally:
+            attributes["aws.credentials.provider"] = (
+                getattr(credentials, "method", None) or "none"
+            )
+            attributes["aws.credentials.success"] = credentials is not None
+
+
+async def _traced_credentials_refresh(
+    tracer: Tracer,
+    histogram: Histogram,
+    credentials: AioRefreshableCredentials,
+    wrapped: Callable[..., Coroutine],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Any:
+    mandatory = kwargs.get("is_mandatory", args[0] if args else False)
+    # Failed advisory refreshes are only logged, keeping the credentials
+    # pylint: disable=protected-access
+    previous = credentials._frozen_credentials
+    with _credentials_span(tracer, histogram, "refresh") as attributes:
+        attributes["aws.credentials.provider"] = str(credentials.method)
+        attributes["aws.credentials.mandatory"] = bool(mandatory)
+        attributes["aws.credentials.success"] = False
+        result = await wrapped(*args, **kwargs)
+        attributes["aws.credentials.success"] = (
+            credentials._frozen_credentials is not previous
+        )
+        return result
@@ -0,0 +1,26 @@
+from typing import (
+    Any,
+)
+
+_TABLE_NAME = "aws.dynamodb.table_name"
+_COUNTED_OPERATIONS = frozenset(("Query", "Scan"))
+
+
+def _get_consumed_capacity(result: dict[str, Any]) -> dict[str, float]:
+    """Capacity units consumed by a call, by table.
+
+    Only returned when the call sets ``ReturnConsumedCapacity``, as one entry
+    for single table operations and as a list for batch and transaction ones.
+    """
+    consumed = result.get("ConsumedCapacity")
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+
+    capacity: dict[str, float] = {}
+    for entry in consumed or ():
+        units = entry.get("CapacityUnits")
+        if units is None:
+            continue
+        table_name = entry.get("TableName", "")
+        capacity[table_name] = capacity.get(table_name, 0.0) + float(units)
+    return capacity
@@ -0,0 +1,100 @@
+from aiohttp import (
+    ClientSession,
+    TraceConfig,
+)
+from opentelemetry.metrics import (
+    Histogram,
+)
+from opentelemetry.trace import (
+    get_current_span,
+)
+from opentelemetry.util.types import (
+    AttributeValue,
+)
+from timeit import (
+    default_timer,
+)
+from types import (
+    SimpleNamespace,
+)
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+)
+
+
+def _create_http_trace_config(
+    histogram: Histogram,
+    get_attributes: Callable[[], dict[str, AttributeValue]],
+) -> TraceConfig:
+    """Create an aiohttp trace config timing the phases of every request.
+
+    The phases are recorded as an ``aws.http.request`` event on the current
+    span, the AWS API call span, and in the given histogram with the metric
+    attributes returned by ``get_attributes``. aiohttp does not report the
+    TLS handshake on its own, so it is part of ``connect``.
+    """
+
+    def timer(
+        started: str, phase: str | None = None
+    ) -> Callable[..., Coroutine]:
+        async def on_signal(
+            _session: ClientSession, ctx: SimpleNamespace, _params: Any
+        ) -> None:
+            now = default_timer()
+            if phase is None:
+                setattr(ctx, started, now)
+            elif hasattr(ctx, started):
+                ctx.phases[phase] = (now - getattr(ctx, started)) * 1000
+
+        return on_signal
+
+    async def on_request_start(
+        _session: ClientSession, ctx: SimpleNamespace, _params: Any
+    ) -> None:
+        ctx.phases = {}
+        ctx.reused = False
+
+    async def on_connection_reuseconn(
+        _session: ClientSession, ctx: SimpleNamespace, _params: Any
+    ) -> None:
+        ctx.reused = True
+
+    async def on_request_done(
+        _session: ClientSession, ctx: SimpleNamespace, _params: Any
+    ) -> None:
+        phases: dict[str, float] = ctx.phases
+        if "connect" in phases:
+            phases["connect"] -= phases.get("dns", 0)
+
+        attributes = get_attributes()
+        for phase, duration in phases.items():
+            histogram.record(duration, {**attributes, "aws.http.phase": phase})
+
+        span = get_current_span()
+        if span.is_recording():
+            event_attributes: dict[str, AttributeValue] = {
+                f"aws.http.{phase}_ms": duration
+                for phase, duration in phases.items()
+            }
+            event_attributes["aws.http.connection_reused"] = ctx.reused
+            span.add_event("aws.http.request", event_attributes)
+
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_queued_start.append(timer("queued"))
+    trace_config.on_connection_queued_end.append(timer("queued", "pool_wait"))
+    trace_config.on_connection_create_start.append(timer("connecting"))
+    trace_config.on_connection_create_end.append(
+        timer("connecting", "connect")
+    )
+    trace_config.on_dns_resolvehost_start.append(timer("resolving"))
+    trace_config.on_dns_resolvehost_end.append(timer("resolving", "dns"))
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_request_headers_sent.append(timer("sent"))
+    trace_config.on_request_end.append(timer("sent", "ttfb"))
+    trace_config.on_request_end.append(on_request_done)
+    trace_config.on_request_exception.append(on_request_done)
+    trace_config.freeze()
+    return trace_config
@@ -0,0 +1,50 @@
+from opentelemetry.semconv.trace import (
+    SpanAttributes,
+)
+from opentelemetry.util.types import (
+    AttributeValue,
+)
+from threading import (
+    Lock,
+)
+
+
+class _InFlight:
+    """In-flight calls and their peak per service and region."""
+
+    __slots__ = ("_counts", "_lock")
+
+    def __init__(self) -> None:
+        # key -> [in flight, peak since the last collection]
+        self._counts: dict[tuple[str, str], list[int]] = {}
+        # Collected from the metric reader thread
+        self._lock = Lock()
+
+    def start(self, key: tuple[str, str]) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(key, [0, 0])
+            counts[0] += 1
+            counts[1] = max(counts[0], counts[1])
+
+    def end(self, key: tuple[str, str]) -> None:
+        with self._lock:
+            self._counts[key][0] -= 1
+
+    def peaks(self) -> list[tuple[tuple[str, str], int]]:
+        """Return the peaks and start the next interval from the current
+        in-flight counts."""
+        with self._lock:
+            peaks = [(key, counts[1]) for key, counts in self._counts.items()]
+            for counts in self._counts.values():
+                counts[1] = counts[0]
+        return peaks
+
+
+def _get_in_flight_attributes(
+    key: tuple[str, str],
+) -> dict[str, AttributeValue]:
+    return {
+        SpanAttributes.RPC_SYSTEM: "aws-api",
+        SpanAttributes.RPC_SERVICE: key[0],
+        "aws.region": key[1],
+    }
@@ -0,0 +1,81 @@
+import logging
+from opentelemetry.instrumentation.botocore.extensions._messaging import (
+    _MAX_MESSAGE_ATTRIBUTES,
+    message_attributes_setter,
+)
+from opentelemetry.propagate import (
+    inject,
+)
+from opentelemetry.propagators.textmap import (
+    TextMapPropagator,
+)
+from typing import (
+    Any,
+    Callable,
+)
+
+_logger = logging.getLogger(__name__)
+
+_Entries = Callable[[dict[str, Any]], list[dict[str, Any]]]
+
+
+def _inject_message_attributes(
+    get_entries: _Entries,
+    params: dict[str, Any],
+    propagator: TextMapPropagator | None,
+) -> None:
+    """Inject the current context into the attributes of every message.
+
+    The context is serialized once and its attributes added to all the
+    messages, except those they would take over the limit of message
+    attributes. The parameters are not validated yet, so this may raise
+    on malformed ones.
+    """
+    entries = get_entries(params)
+    if not entries:
+        return
+
+    carrier: dict[str, Any] = {}
+    if propagator is None:
+        inject(carrier, setter=message_attributes_setter)
+    else:
+        propagator.inject(carrier, setter=message_attributes_setter)
+    if not carrier:
+        return
+
+    skipped = 0
+    for entry in entries:
+        attributes = entry.get("MessageAttributes")
+        if attributes is None:
+            entry["MessageAttributes"] = dict(carrier)
+        elif (
+            len(attributes.keys() | carrier.keys()) <= _MAX_MESSAGE_ATTRIBUTES
+        ):
+            attributes.update(carrier)
+        else:
+            skipped += 1
+
+    if skipped:
+        _logger.warning(
+            "Could not propagate the context to %d of %d messages due to "
+            "the maximum amount of MessageAttributes",
+            skipped,
+            len(entries),
+        )
+
+
+def _get_entries(key: str | None) -> _Entries:
+    def get(params: dict[str, Any]) -> list[dict[str, Any]]:
+        if key is None:
+            return [params]
+        return list(params.get(key) or ())
+
+    return get
+
+
+# Keyed by service id and operation name, the SNS extension already
+# injects the context into the messages it publishes
+_MESSAGE_OPERATIONS: dict[tuple[str, str], _Entries] = {
+    ("SQS", "SendMessage"): _get_entries(None),
+    ("SQS", "SendMessageBatch"): _get_entries("Entries"),
+}
@@ -0,0 +1,155 @@
+from collections import (
+    OrderedDict,
+)
+from io import (
+    SEEK_END,
+)
+from opentelemetry.trace import (
+    Span,
+)
+from opentelemetry.util.types import (
+    AttributeValue,
+)
+from time import (
+    time_ns,
+)
+from typing import (
+    Any,
+)
+
+_CREATE_OPERATION = "CreateMultipartUpload"
+_PART_OPERATIONS = frozenset(("UploadPart", "UploadPartCopy"))
+_END_OPERATIONS = frozenset(
+    ("CompleteMultipartUpload", "AbortMultipartUpload")
+)
+_MULTIPART_OPERATIONS = frozenset(
+    (_CREATE_OPERATION, *_PART_OPERATIONS, *_END_OPERATIONS)
+)
+
+
+def _get_part_size(params: dict[str, Any]) -> int:
+    size = params.get("ContentLength")
+    if isinstance(size, int):
+        return size
+
+    body = params.get("Body")
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+
+    # What is left to read of file-like bodies, which are not read here
+    seekable = getattr(body, "seekable", None)
+    if seekable is None:
+        return 0
+    try:
+        if not seekable():
+            return 0
+        position = body.tell()
+        end = body.seek(0, SEEK_END)
+        body.seek(position)
+    except (OSError, ValueError):
+        # Closed or unsupported, left for botocore to report
+        return 0
+    return int(end - position)
+
+
+class _MultipartUpload:
+    """One multipart upload, from its creation to its completion."""
+
+    __slots__ = (
+        "span",
+        "parts",
+        "size",
+        "in_flight",
+        "concurrency",
+        "slowest_part",
+        "slowest_part_number",
+        "_part_sizes",
+    )
+
+    def __init__(self, span: Span) -> None:
+        self.span = span
+        self.parts = 0
+        self.size = 0
+        self.in_flight = 0
+        self.concurrency = 0
+        self.slowest_part = 0.0
+        self.slowest_part_number: int | None = None
+        # Measured before the call, botocore may replace the body
+        self._part_sizes: dict[Any, int] = {}
+
+    def part_started(self, params: dict[str, Any]) -> None:
+        self._part_sizes[params.get("PartNumber")] = _get_part_size(params)
+        self.in_flight += 1
+        self.concurrency = max(self.concurrency, self.in_flight)
+
+    def part_ended(
+        self, params: dict[str, Any], duration: float, succeeded: bool
+    ) -> None:
+        size = self._part_sizes.pop(params.get("PartNumber"), None)
+        # Parts whose start could not be recorded are left out
+        if size is None:
+            return
+        self.in_flight -= 1
+        if not succeeded:
+            return
+
+        self.parts += 1
+        self.size += size
+        if duration > self.slowest_part:
+            self.slowest_part = duration
+            self.slowest_part_number = params.get("PartNumber")
+
+    def end(self, completed: bool) -> None:
+        attributes: dict[str, AttributeValue] = {
+            "aws.s3.upload.parts": self.parts,
+            "aws.s3.upload.bytes": self.size,
+            "aws.s3.upload.concurrency": self.concurrency,
+            "aws.s3.upload.completed": completed,
+        }
+        if self.slowest_part_number is not None:
+            attributes["aws.s3.upload.slowest_part_ms"] = (
+                self.slowest_part * 1000
+            )
+            attributes["aws.s3.upload.slowest_part_number"] = (
+                self.slowest_part_number
+            )
+
+        start_time = getattr(self.span, "start_time", None)
+        duration = time_ns() - start_time if start_time else 0
+        if duration > 0:
+            attributes["aws.s3.upload.throughput"] = self.size * 1e9 / duration
+
+        self.span.set_attributes(attributes)
+        self.span.end()
+
+
+class _MultipartUploads:
+    """Multipart uploads in progress, by upload id.
+
+    Uploads that are never completed nor aborted are ended, as not completed,
+    once ``max_uploads`` newer ones are in progress.
+    """
+
+    def __init__(self, max_uploads: int = 1024) -> None:
+        self.max_uploads = max_uploads
+        self._uploads: OrderedDict[str, _MultipartUpload] = OrderedDict()
+
+    def get(self, upload_id: Any) -> _MultipartUpload | None:
+        if not isinstance(upload_id, str):
+            return None
+        return self._uploads.get(upload_id)
+
+    def start(self, upload_id: str, span: Span) -> None:
+        self._uploads[upload_id] = _MultipartUpload(span)
+        while len(self._uploads) > self.max_uploads:
+            _, upload = self._uploads.popitem(last=False)
+            upload.end(False)
+
+    def end(self, upload_id: str, completed: bool) -> None:
+        upload = self._uploads.pop(upload_id, None)
+        if upload is not None:
+            upload.end(completed)
@@ -0,0 +1,126 @@
+from opentelemetry import (
+    context as context_api,
+)
+from opentelemetry.trace import (
+    get_current_span,
+    NonRecordingSpan,
+    SpanContext,
+    TraceFlags,
+)
+from random import (
+    getrandbits,
+    random,
+)
+from threading import (
+    Lock,
+)
+from time import (
+    monotonic,
+)
+from typing import (
+    Any,
+    Iterable,
+    Mapping,
+)
+
+
+class _SamplingRule:
+    """Which share of the calls of an operation to trace.
+
+    ``service`` and ``operation`` match the service id and operation name of
+    the calls, any when not given. Matching calls are traced with a
+    probability of ``rate`` and at most ``per_second`` times per second.
+    """
+
+    __slots__ = (
+        "service",
+        "operation",
+        "rate",
+        "per_second",
+        "_tokens",
+        "_last",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        service: str | None = None,
+        operation: str | None = None,
+        rate: float = 1.0,
+        per_second: float | None = None,
+    ) -> None:
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Sampling rate must be in [0, 1], got {rate}")
+        if per_second is not None and per_second <= 0:
+            raise ValueError(
+                f"Sampling per_second must be positive, got {per_second}"
+            )
+
+        self.service = service
+        self.operation = operation
+        self.rate = rate
+        self.per_second = per_second
+        # Token bucket holding up to one second of calls
+        self._tokens = per_second or 0.0
+        self._last = monotonic()
+        self._lock = Lock()
+
+    def matches(self, service: str, operation: str) -> bool:
+        return (self.service is None or self.service == service) and (
+            self.operation is None or self.operation == operation
+        )
+
+    def should_sample(self) -> bool:
+        if self.rate < 1.0 and random() >= self.rate:
+            return False
+        if self.per_second is None:
+            return True
+
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(
+                self.per_second,
+                self._tokens + (now - self._last) * self.per_second,
+            )
+            self._last = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+def _parse_sampling_rules(
+    rules: Iterable[Mapping[str, Any]] | None,
+) -> tuple[_SamplingRule, ...]:
+    return tuple(_SamplingRule(**rule) for rule in rules or ())
+
+
+def _match_sampling_rule(
+    rules: tuple[_SamplingRule, ...], service: str, operation: str
+) -> _SamplingRule | None:
+    # The first rule matching the operation applies
+    for rule in rules:
+        if rule.matches(service, operation):
+            return rule
+    return None
+
+
+def _create_unsampled_span(
+    parent_context: context_api.Context | None,
+) -> NonRecordingSpan:
+    """A span in the trace of the parent, flagged as not sampled.
+
+    What the tracer creates when its sampler drops a span, so that the calls
+    below it, and the services the trace context is propagated to, do not
+    record it either.
+    """
+    parent = get_current_span(parent_context).get_span_context()
+    return NonRecordingSpan(
+        SpanContext(
+            trace_id=parent.trace_id if parent.is_valid else getrandbits(128),
+            span_id=getrandbits(64),
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.DEFAULT),
+            trace_state=parent.trace_state,
+        )
+    )
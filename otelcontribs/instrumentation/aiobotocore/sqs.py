@@ -0,0 +1,199 @@
+from aiobotocore.client import (  # pylint: disable=import-error
+    AioBaseClient,
+)
+from opentelemetry import (
+    context as context_api,
+)
+from opentelemetry.metrics import (
+    get_meter,
+    MeterProvider,
+)
+from opentelemetry.propagate import (
+    extract,
+)
+from opentelemetry.propagators.aws.aws_xray_propagator import (
+    AwsXRayPropagator,
+    TRACE_HEADER_KEY,
+)
+from opentelemetry.propagators.textmap import (
+    Getter,
+    TextMapPropagator,
+)
+from opentelemetry.semconv.trace import (
+    SpanAttributes,
+)
+from opentelemetry.trace import (
+    get_current_span,
+    get_tracer,
+    Link,
+    set_span_in_context,
+    SpanKind,
+    Status,
+    StatusCode,
+    TracerProvider,
+)
+from opentelemetry.util.types import (
+    AttributeValue,
+)
+from otelcontribs.instrumentation.aiobotocore.version import (
+    VERSION,
+)
+from time import (
+    time,
+)
+from typing import (
+    Any,
+    AsyncIterator,
+)
+
+_AWS_TRACE_HEADER = "AWSTraceHeader"
+_SENT_TIMESTAMP = "SentTimestamp"
+
+
+class _MessageAttributesGetter(Getter[dict[str, Any]]):
+    def get(self, carrier: dict[str, Any], key: str) -> list[str] | None:
+        attribute = carrier.get(key)
+        if not isinstance(attribute, dict):
+            return None
+        value = attribute.get("StringValue")
+        return None if value is None else [value]
+
+    def keys(self, carrier: dict[str, Any]) -> list[str]:
+        return list(carrier)
+
+
+_message_attributes_getter = _MessageAttributesGetter()
+
+
+def _extract_producer_context(
+    message: dict[str, Any], propagator: TextMapPropagator | None
+) -> context_api.Context:
+    message_attributes = message.get("MessageAttributes") or {}
+    if propagator is None:
+        producer = extract(
+            message_attributes, getter=_message_attributes_getter
+        )
+    else:
+        producer = propagator.extract(
+            message_attributes, getter=_message_attributes_getter
+        )
+    if get_current_span(producer).get_span_context().is_valid:
+        return producer
+
+    # Set by SQS from the X-Ray header of the send request
+    trace_header = (message.get("Attributes") or {}).get(_AWS_TRACE_HEADER)
+    if trace_header is None:
+        return producer
+    return AwsXRayPropagator().extract({TRACE_HEADER_KEY: trace_header})
+
+
+def _add_names(names: list[str] | None, *required: str) -> list[str]:
+    names = list(names or ())
+    if "All" not in names:
+        names.extend(name for name in required if name not in names)
+    return names
+
+
+async def iter_messages(
+    client: AioBaseClient,
+    queue_url: str,
+    *,
+    tracer_provider: TracerProvider | None = None,
+    meter_provider: MeterProvider | None = None,
+    propagator: TextMapPropagator | None = None,
+    stop_when_empty: bool = False,
+    **receive_kwargs: Any,
+) -> AsyncIterator[dict[str, Any]]:
+    """Receive the messages of an SQS queue, tracing the processing of each.
+
+    Every message is processed in a ``<queue> process`` span, current while
+    the consumer handles the message and ended when it asks for the next one.
+    The span links to the producer span, extracted from the message attributes
+    or from the ``AWSTraceHeader`` attribute. The time the message spent in
+    the queue is recorded in the ``messaging.sqs.queue_lag`` histogram.
+
+    ``receive_kwargs`` are given to every ``receive_message`` call. Messages
+    are received until ``stop_when_empty`` is set and a call returns none.
+    Breaking out of the loop should be done with ``contextlib.aclosing`` so
+    that the span of the last message is ended and detached right away.
+    """
+    tracer = get_tracer(__name__, VERSION, tracer_provider)
+    meter = get_meter(__name__, VERSION, meter_provider)
+    queue_lag = meter.create_histogram(
+        "messaging.sqs.queue_lag",
+        unit="ms",
+        description="Time SQS messages spent in the queue before being "
+        "received",
+    )
+
+    queue_name = queue_url.rsplit("/", 1)[-1]
+    attributes: dict[str, AttributeValue] = {
+        SpanAttributes.MESSAGING_SYSTEM: "aws.sqs",
+        SpanAttributes.MESSAGING_DESTINATION: queue_name,
+        SpanAttributes.MESSAGING_URL: queue_url,
+        SpanAttributes.MESSAGING_OPERATION: "process",
+    }
+    lag_attributes: dict[str, AttributeValue] = {
+        SpanAttributes.MESSAGING_SYSTEM: "aws.sqs",
+        SpanAttributes.MESSAGING_DESTINATION: queue_name,
+    }
+    receive_kwargs["MessageAttributeNames"] = _add_names(
+        receive_kwargs.get("MessageAttributeNames"), "All"
+    )
+    receive_kwargs["AttributeNames"] = _add_names(
+        receive_kwargs.get("AttributeNames"),
+        _AWS_TRACE_HEADER,
+        _SENT_TIMESTAMP,
+    )
+
+    while True:
+        response = await client.receive_message(
+            QueueUrl=queue_url, **receive_kwargs
+        )
+        messages = response.get("Messages") or ()
+        if not messages and stop_when_empty:
+            return
+
+        received = time()
+        for message in messages:
+            sent_timestamp = (message.get("Attributes") or {}).get(
+                _SENT_TIMESTAMP
+            )
+            if sent_timestamp is not None:
+                queue_lag.record(
+                    max(received * 1000 - int(sent_timestamp), 0),
+                    lag_attributes,
+                )
+
+            producer = get_current_span(
+                _extract_producer_context(message, propagator)
+            ).get_span_context()
+            span = tracer.start_span(
+                f"{queue_name} process",
+                kind=SpanKind.CONSUMER,
+                attributes={
+                    **attributes,
+                    SpanAttributes.MESSAGING_MESSAGE_ID: message.get(
+                        "MessageId", ""
+                    ),
+                },
+                links=[Link(producer)] if producer.is_valid else None,
+            )
+            # The span is current while the consumer handles the message
+            token = context_api.attach(set_span_in_context(span))
+            try:
+                yield message
+            except GeneratorExit:
+                # Closed by the consumer, possibly from another context
+                if get_current_span() is span:
+                    context_api.detach(token)
+                span.end()
+                raise
+            except Exception as error:
+                span.record_exception(error)
+                span.set_status(Status(StatusCode.ERROR))
+                context_api.detach(token)
+                span.end()
+                raise
+            context_api.detach(token)
+            span.end()
@@ -0,0 +1,120 @@
+from aiobotocore.response import (  # pylint: disable=import-error
+    StreamingBody,
+)
+from opentelemetry.trace import (
+    Span,
+    Status,
+    StatusCode,
+)
+from opentelemetry.util.types import (
+    AttributeValue,
+)
+from time import (
+    time_ns,
+)
+from typing import (
+    Any,
+)
+from weakref import (
+    finalize,
+)
+from wrapt import (
+    ObjectProxy,
+)
+
+
+class _BodyRead:
+    """Progress of the consumption of a streaming body."""
+
+    __slots__ = ("span", "content_length", "size", "first_read", "ended")
+
+    def __init__(self, span: Span, content_length: int | None) -> None:
+        self.span = span
+        self.content_length = content_length
+        self.size = 0
+        self.first_read: int | None = None
+        self.ended = False
+
+    def end(self, consumed: bool) -> None:
+        if self.ended:
+            return
+        self.ended = True
+
+        attributes: dict[str, AttributeValue] = {
+            "aws.streaming_body.bytes": self.size,
+            "aws.streaming_body.consumed": consumed,
+        }
+        if self.first_read is not None:
+            attributes["aws.streaming_body.ttfb_ms"] = self.first_read / 1e6
+        start_time = getattr(self.span, "start_time", None)
+        duration = time_ns() - start_time if start_time else 0
+        if duration > 0:
+            attributes["aws.streaming_body.throughput"] = (
+                self.size * 1e9 / duration
+            )
+        self.span.set_attributes(attributes)
+        self.span.end()
+
+
+class _TracedStreamingBody(ObjectProxy):  # type: ignore[misc]
+    """A StreamingBody ending a span once it is consumed or abandoned.
+
+    Chunks are passed through as read, the payload is never buffered.
+    """
+
+    def __init__(
+        self,
+        body: StreamingBody,
+        span: Span,
+        content_length: int | None,
+    ) -> None:
+        super().__init__(body)
+        self._self_read = _BodyRead(span, content_length)
+        # Bodies dropped before being fully read are abandoned
+        finalize(self, self._self_read.end, False)
+
+    async def read(self, amt: int | None = None) -> bytes:
+        body_read = self._self_read
+        start = time_ns()
+        try:
+            chunk: bytes = await self.__wrapped__.read(amt)
+        except Exception as error:
+            body_read.span.record_exception(error)
+            body_read.span.set_status(Status(StatusCode.ERROR))
+            body_read.end(False)
+            raise
+
+        if body_read.first_read is None:
+            body_read.first_read = time_ns() - start
+        body_read.size += len(chunk)
+        if (
+            amt is None
+            or (not chunk and amt > 0)
+            or body_read.size == body_read.content_length
+        ):
+            body_read.end(True)
+        return chunk
+
+    def close(self) -> None:
+        self.__wrapped__.close()
+        self._self_read.end(False)
+
+    async def __aenter__(self) -> "_TracedStreamingBody":
+        # StreamingBody returns the aiohttp response, whose reads would
+        # bypass the proxy, while the proxy still exposes its attributes
+        await self.__wrapped__.__aenter__()
+        return self
+
+    async def __aexit__(self, *args: Any) -> Any:
+        try:
+            return await self.__wrapped__.__aexit__(*args)
+        finally:
+            self._self_read.end(False)
+
+    # These only read through self.read
+    readlines = StreamingBody.readlines
+    iter_lines = StreamingBody.iter_lines
+    iter_chunks = StreamingBody.iter_chunks
+    __aiter__ = StreamingBody.__aiter__
+    __anext__ = StreamingBody.__anext__
+    anext = StreamingBody.anext
@@ -1,6 +1,10 @@
 import aiobotocore.awsrequest  # pylint: disable=import-error
 import aiobotocore.endpoint  # pylint: disable=import-error
+import aiobotocore.handlers  # pylint: disable=import-error
 import aiobotocore.retryhandler  # pylint: disable=import-error
+from aiohttp import (
+    ClientResponse,
+)
 from botocore.model import (
     OperationModel,
 )
@@ -35,6 +39,15 @@ class MockedAWSResponse(
         return self._response.content
 
 
+def mock_response(
+    response: aiobotocore.awsrequest.AioAWSResponse,
+) -> aiobotocore.awsrequest.AioAWSResponse:
+    # Responses from a real server need no patching
+    if isinstance(response.raw, ClientResponse):
+        return response
+    return MockedAWSResponse(response)
+
+
 @pytest.fixture(autouse=True, scope="session")
 def patch_aiobotocore_endpoint() -> None:
     original = aiobotocore.endpoint.convert_to_response_dict
@@ -43,7 +56,7 @@ def patch_aiobotocore_endpoint() -> None:
         http_response: aiobotocore.awsrequest.AioAWSResponse,
         operation_model: OperationModel,
     ) -> Awaitable[dict[str, Any]]:
-        return original(MockedAWSResponse(http_response), operation_model)
+        return original(mock_response(http_response), operation_model)
 
     aiobotocore.endpoint.convert_to_response_dict = patched
 
@@ -58,7 +71,21 @@ def patch_aiobotocore_retryhandler() -> None:
         attempt_number: int,
         response: aiobotocore.awsrequest.AioAWSResponse,
     ) -> Awaitable[None]:
-        return original(self, attempt_number, [MockedAWSResponse(response[0])])
+        return original(self, attempt_number, [mock_response(response[0])])
 
     # pylint: disable=protected-access
     aiobotocore.retryhandler.AioCRC32Checker._check_response = patched
+
+
+@pytest.fixture(autouse=True, scope="session")
+def patch_aiobotocore_handlers() -> None:
+    # pylint: disable=protected-access
+    original = aiobotocore.handlers._looks_like_special_case_error
+
+    def patched(
+        http_response: aiobotocore.awsrequest.AioAWSResponse,
+    ) -> Awaitable[bool]:
+        return original(mock_response(http_response))
+
+    # pylint: disable=protected-access
+    aiobotocore.handlers._looks_like_special_case_error = patched
@@ -203,6 +203,9 @@ class TestDynamoDbExtension(
         span = self.assert_span("BatchGetItem")
         self.assert_table_names(span, table_name1, table_name2)
         self.assert_consumed_capacity(span, table_name1, table_name2)
+        self.assertEqual(2, span.attributes["aws.batch.size"])
+        self.assertEqual(0, span.attributes["aws.batch.failed"])
+        self.assertNotIn("aws.batch.bytes", span.attributes)
 
     @mock_dynamodb2
     def test_batch_write_item(self) -> None:
@@ -230,6 +233,8 @@ class TestDynamoDbExtension(
         self.assert_table_names(span, table_name1, table_name2)
         self.assert_consumed_capacity(span, table_name1, table_name2)
         self.assert_item_col_metrics(span)
+        self.assertEqual(2, span.attributes["aws.batch.size"])
+        self.assertEqual(0, span.attributes["aws.batch.failed"])
 
     @mock_dynamodb2
     def test_create_table(self) -> None:
@@ -409,6 +414,10 @@ class TestDynamoDbExtension(
         self.assert_projection(span, "1,2")
         self.assert_select(span, "ALL_ATTRIBUTES")
         self.assert_consumed_capacity(span, self.default_table_name)
+        self.assertIn(SpanAttributes.AWS_DYNAMODB_COUNT, span.attributes)
+        self.assertIn(
+            SpanAttributes.AWS_DYNAMODB_SCANNED_COUNT, span.attributes
+        )
 
     @mock_dynamodb2
     def test_scan(self) -> None:
@@ -449,6 +458,78 @@ class TestDynamoDbExtension(
         self.assert_select(span, "ALL_ATTRIBUTES")
         self.assert_consumed_capacity(span, self.default_table_name)
 
+    @mock_dynamodb2
+    def test_scan_capacity_and_counts(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider
+        )
+        self._create_table()
+        for index in range(3):
+            async_call(
+                self.client.put_item(
+                    TableName=self.default_table_name,
+                    Item={"id": {"S": str(index)}},
+                )
+            )
+        self.memory_exporter.clear()
+
+        def set_content_length(parsed: dict[str, Any], **_kwargs: Any) -> None:
+            # moto does not send the header
+            parsed["ResponseMetadata"]["HTTPHeaders"]["content-length"] = "100"
+
+        self.client.meta.events.register(
+            "after-call.dynamodb.Scan", set_content_length
+        )
+        async_call(
+            self.client.scan(
+                TableName=self.default_table_name,
+                FilterExpression="id = :id",
+                ExpressionAttributeValues={":id": {"S": "1"}},
+                ReturnConsumedCapacity="TOTAL",
+            )
+        )
+
+        span = self.assert_span("Scan")
+        self.assertEqual(1, span.attributes[SpanAttributes.AWS_DYNAMODB_COUNT])
+        self.assertEqual(
+            3, span.attributes[SpanAttributes.AWS_DYNAMODB_SCANNED_COUNT]
+        )
+        self.assertGreater(
+            float(span.attributes["aws.dynamodb.consumed_capacity_units"]), 0
+        )
+        self.assertEqual(
+            100, span.attributes[SpanAttributes.HTTP_RESPONSE_CONTENT_LENGTH]
+        )
+
+        points = {
+            metric.name: metric.data.data_points
+            for metric in self.get_sorted_metrics()
+            if metric.name.startswith("aws.dynamodb.")
+        }
+        for name, expected in (
+            ("aws.dynamodb.count", 1),
+            ("aws.dynamodb.scanned_count", 3),
+        ):
+            (point,) = [
+                point
+                for point in points[name]
+                if point.attributes["rpc.method"] == "Scan"
+            ]
+            self.assertEqual(point.sum, expected)
+            self.assertEqual(
+                point.attributes["aws.dynamodb.table_name"],
+                self.default_table_name,
+            )
+        (point,) = points["aws.dynamodb.consumed_capacity"]
+        self.assertEqual(
+            point.attributes["aws.dynamodb.table_name"],
+            self.default_table_name,
+        )
+        self.assertEqual(
+            point.sum, span.attributes["aws.dynamodb.consumed_capacity_units"]
+        )
+
     @mock_dynamodb2
     def test_update_item(self) -> None:
         self._create_prepared_table()
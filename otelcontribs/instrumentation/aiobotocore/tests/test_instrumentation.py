@@ -1,13 +1,40 @@
 from aiobotocore.client import (  # pylint: disable=import-error
     AioBaseClient,
 )
+from aiobotocore.config import (  # pylint: disable=import-error
+    AioConfig,
+)
+from aiobotocore.credentials import (  # pylint: disable=import-error
+    AioRefreshableCredentials,
+)
 import aiobotocore.session  # pylint: disable=import-error
+from aiohttp import (
+    web,
+)
 import asyncio
+from botocore.awsrequest import (
+    AWSResponse,
+)
 from botocore.exceptions import (
+    ClientError,
     ParamValidationError,
+    WaiterError,
+)
+from contextlib import (
+    asynccontextmanager,
+)
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+import gc
+from io import (
+    BytesIO,
 )
 import json
 from moto import (
+    mock_dynamodb2,
     mock_ec2,
     mock_kinesis,
     mock_kms,
@@ -16,6 +43,9 @@ from moto import (
     mock_sts,
     mock_xray,
 )
+from moto.core.models import (
+    MockRawResponse,
+)
 from opentelemetry import (
     trace as trace_api,
 )
@@ -30,6 +60,12 @@ from opentelemetry.propagate import (
     get_global_textmap,
     set_global_textmap,
 )
+from opentelemetry.sdk.trace import (
+    TracerProvider,
+)
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_OFF,
+)
 from opentelemetry.semconv.trace import (
     SpanAttributes,
 )
@@ -50,7 +86,9 @@ from otelcontribs.instrumentation.aiobotocore import (
 )
 from typing import (
     Any,
+    AsyncIterator,
     Awaitable,
+    Callable,
     TypeVar,
 )
 from unittest.mock import (
@@ -74,6 +112,39 @@ def async_call(coro: Awaitable[T]) -> T:
     return loop.run_until_complete(coro)
 
 
+@asynccontextmanager
+async def serve(app: web.Application) -> AsyncIterator[str]:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    ((_, port),) = runner.addresses
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+def throttle_once(
+    error_code: str = "ThrottlingException",
+) -> Callable[..., AWSResponse | None]:
+    throttled: list[Any] = []
+
+    def throttle(request: Any, **_kwargs: Any) -> AWSResponse | None:
+        if throttled:
+            return None
+        throttled.append(request)
+        body = json.dumps(
+            {
+                "__type": f"com.amazonaws.dynamodb.v20120810#{error_code}",
+                "message": "Rate exceeded",
+            }
+        )
+        return AWSResponse(request.url, 400, {}, MockRawResponse(body))
+
+    return throttle
+
+
 # pylint:disable=too-many-public-methods
 class TestAiobotocoreInstrumentor(TestBase):
     """AioBotocore integration testsuite"""
@@ -150,6 +221,819 @@ class TestAiobotocoreInstrumentor(TestBase):
         request_id = "fdcdcab1-ae5c-489e-9c33-4637c5dda355"
         self.assert_span("EC2", "DescribeInstances", request_id=request_id)
 
+    @mock_dynamodb2
+    def test_span_covers_awaited_call(self) -> None:
+        dynamodb = self._make_client("dynamodb")
+
+        async def slow_send(**_kwargs: Any) -> None:
+            await asyncio.sleep(0.1)
+
+        dynamodb.meta.events.register_first(
+            "before-send.dynamodb.ListTables", slow_send
+        )
+        async_call(dynamodb.list_tables())
+
+        (span,) = self.memory_exporter.get_finished_spans()
+        self.assertEqual("DynamoDB.ListTables", span.name)
+        assert span.start_time is not None and span.end_time is not None
+        self.assertGreaterEqual(span.end_time - span.start_time, 100_000_000)
+
+    @mock_dynamodb2
+    def test_retry_attempt_spans(self) -> None:
+        dynamodb = self._make_client("dynamodb")
+        dynamodb.meta.events.register_first(
+            "before-send.dynamodb.ListTables", throttle_once()
+        )
+        async_call(dynamodb.list_tables())
+
+        spans = self.memory_exporter.get_finished_spans()
+        (call_span,) = [
+            span for span in spans if span.name == "DynamoDB.ListTables"
+        ]
+        self.assertEqual(1, call_span.attributes["retry_attempts"])
+
+        first, second = sorted(
+            (
+                span
+                for span in spans
+                if span.name == "DynamoDB.ListTables attempt"
+            ),
+            key=lambda span: span.start_time,
+        )
+        for attempt in (first, second):
+            self.assertEqual(call_span.context.span_id, attempt.parent.span_id)
+            self.assertGreaterEqual(attempt.start_time, call_span.start_time)
+            self.assertLessEqual(attempt.end_time, call_span.end_time)
+
+        self.assertEqual(1, first.attributes["aws.attempt"])
+        self.assertEqual(400, first.attributes["http.status_code"])
+        self.assertEqual("ThrottlingException", first.attributes["error.type"])
+        self.assertNotIn("aws.retry.backoff_ms", first.attributes)
+
+        self.assertEqual(2, second.attributes["aws.attempt"])
+        self.assertEqual(200, second.attributes["http.status_code"])
+        self.assertNotIn("error.type", second.attributes)
+        backoff = second.attributes["aws.retry.backoff_ms"]
+        self.assertGreater(backoff, 0)
+        self.assertEqual(backoff, call_span.attributes["aws.retry.backoff_ms"])
+        self.assertGreaterEqual(
+            second.start_time - first.end_time, backoff * 1e6
+        )
+
+    @mock_dynamodb2
+    def test_single_attempt_has_no_attempt_spans(self) -> None:
+        dynamodb = self._make_client("dynamodb")
+
+        async_call(dynamodb.list_tables())
+
+        span = self.assert_only_span()
+        self.assertNotIn("aws.retry.backoff_ms", span.attributes)
+
+    @mock_dynamodb2
+    def test_throttles(self) -> None:
+        hook_calls = []
+
+        def throttle_hook(
+            service: str, operation: str, resource: str | None, count: int
+        ) -> None:
+            hook_calls.append((service, operation, resource, count))
+
+        instrumentor = AiobotocoreInstrumentor()
+        instrumentor.uninstrument()
+        instrumentor.instrument(
+            meter_provider=self.meter_provider, throttle_hook=throttle_hook
+        )
+        dynamodb = self._make_client("dynamodb")
+        async_call(
+            dynamodb.create_table(
+                TableName="table",
+                KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+                AttributeDefinitions=[
+                    {"AttributeName": "id", "AttributeType": "S"}
+                ],
+                BillingMode="PAY_PER_REQUEST",
+            )
+        )
+
+        dynamodb.meta.events.register_first(
+            "before-send.dynamodb.Scan",
+            throttle_once("ProvisionedThroughputExceededException"),
+        )
+        async_call(dynamodb.scan(TableName="table"))
+
+        self.assertEqual([("DynamoDB", "Scan", "table", 1)], hook_calls)
+        self.assertEqual(
+            1, instrumentor.throttle_count("DynamoDB", "Scan", "table")
+        )
+        self.assertEqual(0, instrumentor.throttle_count("DynamoDB", "Scan"))
+
+        (throttles,) = self._get_metrics()["aws.throttles"].data.data_points
+        self.assertEqual(1, throttles.value)
+        self.assertEqual(
+            {
+                SpanAttributes.RPC_SERVICE: "DynamoDB",
+                SpanAttributes.RPC_METHOD: "Scan",
+                "aws.resource": "table",
+            },
+            dict(throttles.attributes),
+        )
+
+    @mock_dynamodb2
+    def test_in_flight_metrics(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider
+        )
+        dynamodb = self._make_client("dynamodb")
+
+        async def slow_send(**_kwargs: Any) -> None:
+            await asyncio.sleep(0.01)
+
+        dynamodb.meta.events.register_first(
+            "before-send.dynamodb.ListTables", slow_send
+        )
+
+        async def list_tables() -> None:
+            await asyncio.gather(*(dynamodb.list_tables() for _ in range(3)))
+
+        async_call(list_tables())
+
+        expected = {
+            SpanAttributes.RPC_SYSTEM: "aws-api",
+            SpanAttributes.RPC_SERVICE: "DynamoDB",
+            "aws.region": self.region,
+        }
+        metrics = self._get_metrics()
+        (active,) = metrics["rpc.client.active_requests"].data.data_points
+        self.assertEqual(expected, dict(active.attributes))
+        self.assertEqual(0, active.value)
+        (peak,) = metrics["rpc.client.active_requests.peak"].data.data_points
+        self.assertEqual(expected, dict(peak.attributes))
+        self.assertEqual(3, peak.value)
+
+        metrics = self._get_metrics()
+        (peak,) = metrics["rpc.client.active_requests.peak"].data.data_points
+        self.assertEqual(0, peak.value)
+
+    def test_http_phase_timings(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider, http_phase_timings=True
+        )
+
+        async def list_tables(_request: web.Request) -> web.Response:
+            await asyncio.sleep(0.05)
+            return web.json_response(
+                {"TableNames": []},
+                content_type="application/x-amz-json-1.0",
+            )
+
+        async def call_server() -> None:
+            app = web.Application()
+            app.router.add_post("/", list_tables)
+            async with serve(app) as endpoint_url, self.session.create_client(
+                "dynamodb",
+                region_name=self.region,
+                endpoint_url=endpoint_url,
+                config=AioConfig(max_pool_connections=1),
+            ) as dynamodb:
+                await asyncio.gather(
+                    dynamodb.list_tables(), dynamodb.list_tables()
+                )
+
+        async_call(call_server())
+
+        first, queued = sorted(
+            (
+                span.events[0].attributes
+                for span in self.memory_exporter.get_finished_spans()
+            ),
+            key=lambda attributes: "aws.http.pool_wait_ms" in attributes,
+        )
+        self.assertFalse(first["aws.http.connection_reused"])
+        self.assertGreater(first["aws.http.connect_ms"], 0)
+        self.assertGreaterEqual(first["aws.http.ttfb_ms"], 50)
+        self.assertNotIn("aws.http.pool_wait_ms", first)
+
+        self.assertTrue(queued["aws.http.connection_reused"])
+        self.assertGreaterEqual(queued["aws.http.pool_wait_ms"], 50)
+        self.assertNotIn("aws.http.connect_ms", queued)
+        self.assertGreaterEqual(queued["aws.http.ttfb_ms"], 50)
+
+        phases = self._get_metrics()["aws.http.phase.duration"].data
+        self.assertEqual(
+            {"pool_wait": 1, "connect": 1, "ttfb": 2},
+            {
+                point.attributes["aws.http.phase"]: point.count
+                for point in phases.data_points
+            },
+        )
+
+    async def _create_table(self, dynamodb: AioBaseClient) -> None:
+        await dynamodb.create_table(
+            TableName="table",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "id", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        for index in range(5):
+            await dynamodb.put_item(
+                TableName="table", Item={"id": {"S": str(index)}}
+            )
+        self.memory_exporter.clear()
+
+    @mock_dynamodb2
+    def test_paginate(self) -> None:
+        dynamodb = self._make_client("dynamodb")
+
+        def set_content_length(parsed: dict[str, Any], **_kwargs: Any) -> None:
+            # moto does not send the header
+            parsed["ResponseMetadata"]["HTTPHeaders"]["content-length"] = "100"
+
+        dynamodb.meta.events.register(
+            "after-call.dynamodb.Scan", set_content_length
+        )
+
+        async def paginate() -> list[dict[str, Any]]:
+            await self._create_table(dynamodb)
+
+            items = []
+            paginator = dynamodb.get_paginator("scan")
+            async for page in paginator.paginate(
+                TableName="table", PaginationConfig={"PageSize": 2}
+            ):
+                items.extend(page["Items"])
+                await asyncio.sleep(0.01)
+            return items
+
+        self.assertEqual(5, len(async_call(paginate())))
+
+        spans = self.memory_exporter.get_finished_spans()
+        (paginate_span,) = [
+            span for span in spans if span.name == "DynamoDB.Scan paginate"
+        ]
+        page_spans = [span for span in spans if span.name == "DynamoDB.Scan"]
+        self.assertEqual(3, len(page_spans))
+        for page_span in page_spans:
+            self.assertEqual(
+                paginate_span.context.span_id, page_span.parent.span_id
+            )
+
+        attributes = paginate_span.attributes
+        self.assertEqual(3, attributes["aws.pagination.pages"])
+        self.assertEqual(5, attributes["aws.pagination.items"])
+        self.assertEqual(300, attributes["aws.pagination.bytes"])
+        self.assertGreater(attributes["aws.pagination.fetch_ms"], 0)
+        self.assertGreaterEqual(attributes["aws.pagination.consumer_ms"], 30)
+
+    @mock_dynamodb2
+    def test_paginate_break(self) -> None:
+        dynamodb = self._make_client("dynamodb")
+
+        async def paginate() -> None:
+            await self._create_table(dynamodb)
+
+            pages = dynamodb.get_paginator("scan").paginate(
+                TableName="table", PaginationConfig={"PageSize": 2}
+            )
+            iterator = aiter(pages)
+            await anext(iterator)
+            await iterator.aclose()
+
+        async_call(paginate())
+
+        (paginate_span,) = [
+            span
+            for span in self.memory_exporter.get_finished_spans()
+            if span.name == "DynamoDB.Scan paginate"
+        ]
+        self.assertEqual(1, paginate_span.attributes["aws.pagination.pages"])
+
+    @mock_dynamodb2
+    def test_waiter(self) -> None:
+        dynamodb = self._make_client("dynamodb")
+        async_call(self._create_table(dynamodb))
+
+        async_call(dynamodb.get_waiter("table_exists").wait(TableName="table"))
+        with self.assertRaises(WaiterError):
+            async_call(
+                dynamodb.get_waiter("table_not_exists").wait(
+                    TableName="table",
+                    WaiterConfig={"Delay": 0.01, "MaxAttempts": 3},
+                )
+            )
+
+        spans = self.memory_exporter.get_finished_spans()
+        exists_span, not_exists_span = [
+            span for span in spans if span.name.endswith(" wait")
+        ]
+        self.assertEqual(exists_span.name, "DynamoDB.TableExists wait")
+        self.assertEqual(
+            exists_span.attributes["aws.waiter.name"], "TableExists"
+        )
+        self.assertEqual(exists_span.attributes["rpc.method"], "DescribeTable")
+        self.assertEqual(exists_span.attributes["aws.waiter.polls"], 1)
+        self.assertEqual(exists_span.attributes["aws.waiter.state"], "success")
+
+        self.assertEqual(
+            not_exists_span.status.status_code, trace_api.StatusCode.ERROR
+        )
+        self.assertEqual(not_exists_span.attributes["aws.waiter.polls"], 3)
+        self.assertEqual(
+            not_exists_span.attributes["aws.waiter.state"], "timeout"
+        )
+        self.assertGreaterEqual(
+            not_exists_span.attributes["aws.waiter.sleep_ms"], 20
+        )
+
+        polls = [
+            span for span in spans if span.name == "DynamoDB.DescribeTable"
+        ]
+        self.assertEqual(
+            [poll.parent.span_id for poll in polls],
+            [exists_span.context.span_id]
+            + [not_exists_span.context.span_id] * 3,
+        )
+
+    @mock_dynamodb2
+    def test_waiter_without_poll_spans(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(waiter_poll_spans=False)
+        dynamodb = self._make_client("dynamodb")
+        async_call(self._create_table(dynamodb))
+
+        with self.assertRaises(WaiterError):
+            async_call(
+                dynamodb.get_waiter("table_not_exists").wait(
+                    TableName="table",
+                    WaiterConfig={"Delay": 0, "MaxAttempts": 2},
+                )
+            )
+
+        (span,) = self.memory_exporter.get_finished_spans()
+        self.assertEqual(span.name, "DynamoDB.TableNotExists wait")
+        self.assertEqual(span.attributes["aws.waiter.polls"], 2)
+
+    def test_client_creation(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider, client_creation_spans=True
+        )
+
+        self._make_client("dynamodb")
+        self._make_client("dynamodb")
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans), 2)
+        for span in spans:
+            self.assertEqual(span.name, "AWS client create")
+            self.assertEqual(span.attributes["rpc.service"], "DynamoDB")
+            self.assertEqual(span.attributes["aws.region"], self.region)
+        # Models are loaded once per session
+        self.assertGreater(spans[0].attributes["aws.client.model_load_ms"], 0)
+        self.assertLess(
+            spans[1].attributes["aws.client.model_load_ms"],
+            spans[0].attributes["aws.client.model_load_ms"],
+        )
+        self.assertGreater(
+            spans[0].attributes["aws.client.endpoint_resolution_ms"], 0
+        )
+
+        (metric,) = [
+            metric
+            for metric in self.get_sorted_metrics()
+            if metric.name == "aws.client.created"
+        ]
+        (point,) = metric.data.data_points
+        self.assertEqual(point.value, 2)
+        self.assertEqual(
+            dict(point.attributes),
+            {"rpc.service": "DynamoDB", "aws.region": self.region},
+        )
+
+    def test_client_creation_without_spans(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider
+        )
+
+        self._make_client("sqs")
+
+        self.assertFalse(self.memory_exporter.get_finished_spans())
+        (metric,) = [
+            metric
+            for metric in self.get_sorted_metrics()
+            if metric.name == "aws.client.created"
+        ]
+        self.assertEqual(metric.data.data_points[0].value, 1)
+
+    @mock_sqs
+    def test_credentials_refresh(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider
+        )
+
+        async def refresh() -> dict[str, str]:
+            return {
+                "access_key": "refreshed-access-key",
+                "secret_key": "refreshed-secret-key",
+                "token": "refreshed-token",
+                "expiry_time": (
+                    datetime.now(timezone.utc) + timedelta(hours=1)
+                ).isoformat(),
+            }
+
+        # Expired, so refreshing them is mandatory before the first call
+        # pylint: disable=protected-access
+        self.session._credentials = (
+            AioRefreshableCredentials.create_from_metadata(
+                {
+                    "access_key": "access-key",
+                    "secret_key": "secret-key",
+                    "token": "token",
+                    "expiry_time": (
+                        datetime.now(timezone.utc) - timedelta(hours=1)
+                    ).isoformat(),
+                },
+                refresh,
+                "assume-role",
+            )
+        )
+        sqs = self._make_client("sqs")
+        async_call(sqs.list_queues())
+        async_call(sqs.list_queues())
+
+        spans = self.memory_exporter.get_finished_spans()
+        refresh_span, call_span, _ = spans
+        self.assertEqual(refresh_span.name, "AWS credentials refresh")
+        self.assertIsNone(refresh_span.parent)
+        self.assertEqual(
+            [link.context.span_id for link in refresh_span.links],
+            [call_span.context.span_id],
+        )
+        self.assertEqual(
+            dict(refresh_span.attributes),
+            {
+                "aws.credentials.operation": "refresh",
+                "aws.credentials.provider": "assume-role",
+                "aws.credentials.mandatory": True,
+                "aws.credentials.success": True,
+            },
+        )
+
+        (metric,) = [
+            metric
+            for metric in self.get_sorted_metrics()
+            if metric.name == "aws.credentials.duration"
+        ]
+        (point,) = metric.data.data_points
+        self.assertEqual(point.count, 1)
+        self.assertEqual(point.attributes, refresh_span.attributes)
+
+    @mock_sqs
+    def test_credentials_load(self) -> None:
+        session = aiobotocore.session.get_session()
+        # moto sets credentials in the environment
+        async_call(session.get_credentials())
+
+        (span,) = self.memory_exporter.get_finished_spans()
+        self.assertEqual(span.name, "AWS credentials load")
+        self.assertEqual(span.attributes["aws.credentials.provider"], "env")
+        self.assertTrue(span.attributes["aws.credentials.success"])
+
+    def _get_object(
+        self, read: Callable[[Any], Awaitable[None]], **kwargs: Any
+    ) -> Span:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(streaming_body_spans=True)
+
+        async def get_object(_request: web.Request) -> web.Response:
+            return web.Response(body=b"0123456789" * 1000)
+
+        async def call_server() -> None:
+            app = web.Application()
+            app.router.add_get("/bucket/key", get_object)
+            async with serve(app) as endpoint_url, self.session.create_client(
+                "s3",
+                region_name=self.region,
+                endpoint_url=endpoint_url,
+                config=AioConfig(s3={"addressing_style": "path"}),
+            ) as s3:
+                result = await s3.get_object(Bucket="bucket", Key="key")
+                await read(result["Body"])
+
+        async_call(call_server())
+
+        call_span, body_span = sorted(
+            self.memory_exporter.get_finished_spans(),
+            key=lambda span: span.start_time,
+        )
+        self.assertEqual("S3.GetObject", call_span.name)
+        self.assertEqual("S3.GetObject body", body_span.name)
+        self.assertEqual(call_span.context.span_id, body_span.parent.span_id)
+        self.assertGreaterEqual(body_span.end_time, call_span.end_time)
+        return body_span
+
+    def test_streaming_body_read(self) -> None:
+        async def read(body: Any) -> None:
+            self.assertEqual(10000, len(await body.read()))
+
+        span = self._get_object(read)
+        self.assertEqual(10000, span.attributes["aws.streaming_body.bytes"])
+        self.assertTrue(span.attributes["aws.streaming_body.consumed"])
+        self.assertGreater(
+            float(span.attributes["aws.streaming_body.ttfb_ms"]), 0
+        )
+        self.assertGreater(
+            float(span.attributes["aws.streaming_body.throughput"]), 0
+        )
+
+    def test_streaming_body_async_with(self) -> None:
+        async def read(body: Any) -> None:
+            async with body as stream:
+                self.assertEqual(200, stream.status)
+                self.assertEqual(10000, len(await stream.read()))
+
+        span = self._get_object(read)
+        self.assertEqual(10000, span.attributes["aws.streaming_body.bytes"])
+        self.assertTrue(span.attributes["aws.streaming_body.consumed"])
+
+    def test_streaming_body_iter_chunks(self) -> None:
+        async def read(body: Any) -> None:
+            chunks = [chunk async for chunk in body.iter_chunks(4096)]
+            self.assertEqual([4096, 4096, 1808], [len(c) for c in chunks])
+
+        span = self._get_object(read)
+        self.assertEqual(10000, span.attributes["aws.streaming_body.bytes"])
+        self.assertTrue(span.attributes["aws.streaming_body.consumed"])
+
+    def test_streaming_body_abandoned(self) -> None:
+        async def read(body: Any) -> None:
+            await body.read(100)
+            body.close()
+
+        span = self._get_object(read)
+        self.assertEqual(100, span.attributes["aws.streaming_body.bytes"])
+        self.assertFalse(span.attributes["aws.streaming_body.consumed"])
+
+    def test_streaming_body_garbage_collected(self) -> None:
+        async def read(body: Any) -> None:
+            await body.read(100)
+
+        span = self._get_object(read)
+        self.assertEqual(100, span.attributes["aws.streaming_body.bytes"])
+        self.assertFalse(span.attributes["aws.streaming_body.consumed"])
+
+    @mock_dynamodb2
+    def test_throttle_window(self) -> None:
+        instrumentor = AiobotocoreInstrumentor()
+        instrumentor.uninstrument()
+        instrumentor.instrument(throttle_window=0.01)
+        dynamodb = self._make_client("dynamodb")
+
+        dynamodb.meta.events.register_first(
+            "before-send.dynamodb.ListTables", throttle_once()
+        )
+        async_call(dynamodb.list_tables())
+        async_call(asyncio.sleep(0.01))
+
+        self.assertEqual(
+            0, instrumentor.throttle_count("DynamoDB", "ListTables")
+        )
+
+    def _get_metrics(self) -> dict[str, Any]:
+        return {metric.name: metric for metric in self.get_sorted_metrics()}
+
+    @mock_sqs
+    def test_metrics(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider
+        )
+        sqs = self._make_client("sqs")
+
+        async_call(sqs.list_queues())
+
+        metrics = self._get_metrics()
+        self.assertNotIn("rpc.client.errors", metrics)
+        expected = {
+            SpanAttributes.RPC_SYSTEM: "aws-api",
+            SpanAttributes.RPC_SERVICE: "SQS",
+            SpanAttributes.RPC_METHOD: "ListQueues",
+            "aws.region": self.region,
+            SpanAttributes.HTTP_STATUS_CODE: 200,
+        }
+
+        (duration,) = metrics["rpc.client.duration"].data.data_points
+        self.assertEqual(expected, dict(duration.attributes))
+        self.assertEqual(1, duration.count)
+
+        (requests,) = metrics["rpc.client.requests"].data.data_points
+        self.assertEqual(expected, dict(requests.attributes))
+        self.assertEqual(1, requests.value)
+
+    @mock_sqs
+    def test_sampling_rules(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider,
+            sampling_rules=[
+                {"service": "SQS", "operation": "ListQueues", "rate": 0.0},
+                {"service": "SQS", "per_second": 1},
+            ],
+        )
+        sqs = self._make_client("sqs")
+
+        async def call() -> None:
+            with self.tracer_provider.get_tracer("test").start_as_current_span(
+                "parent"
+            ) as parent:
+                await sqs.list_queues()
+                self.assertIs(trace_api.get_current_span(), parent)
+            await sqs.list_queues()
+            await sqs.create_queue(QueueName="queue1")
+            await sqs.create_queue(QueueName="queue2")
+
+        async_call(call())
+
+        self.assertEqual(
+            ["parent", "SQS.CreateQueue"],
+            [span.name for span in self.memory_exporter.get_finished_spans()],
+        )
+        # Dropped calls are still measured
+        (requests,) = [
+            point
+            for point in self._get_metrics()[
+                "rpc.client.requests"
+            ].data.data_points
+            if point.attributes[SpanAttributes.RPC_METHOD] == "ListQueues"
+        ]
+        self.assertEqual(2, requests.value)
+
+    def test_invalid_sampling_rule(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        with self.assertRaises(ValueError):
+            AiobotocoreInstrumentor().instrument(
+                sampling_rules=[{"service": "SQS", "rate": 2}]
+            )
+
+    @mock_sqs
+    def test_payload_sizes(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider
+        )
+        sqs = self._make_client("sqs")
+
+        def set_content_length(parsed: dict[str, Any], **_kwargs: Any) -> None:
+            # moto does not send the header
+            parsed["ResponseMetadata"]["HTTPHeaders"]["content-length"] = "321"
+
+        sqs.meta.events.register(
+            "after-call.sqs.SendMessage", set_content_length
+        )
+        queue_url = async_call(sqs.create_queue(QueueName="queue"))["QueueUrl"]
+        self.memory_exporter.clear()
+        async_call(sqs.send_message(QueueUrl=queue_url, MessageBody="x" * 500))
+
+        span = self.assert_only_span()
+        request_size = int(
+            span.attributes[SpanAttributes.HTTP_REQUEST_CONTENT_LENGTH]
+        )
+        self.assertGreater(request_size, 500)
+        self.assertEqual(
+            321, span.attributes[SpanAttributes.HTTP_RESPONSE_CONTENT_LENGTH]
+        )
+
+        metrics = self._get_metrics()
+        for name, expected in (
+            ("rpc.client.request.size", request_size),
+            ("rpc.client.response.size", 321),
+        ):
+            (point,) = [
+                point
+                for point in metrics[name].data.data_points
+                if point.attributes[SpanAttributes.RPC_METHOD] == "SendMessage"
+            ]
+            self.assertEqual(expected, point.sum)
+            self.assertEqual(
+                "SQS", point.attributes[SpanAttributes.RPC_SERVICE]
+            )
+
+    @mock_kinesis
+    def test_batch_metrics(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider
+        )
+        kinesis = self._make_client("kinesis")
+        async_call(kinesis.create_stream(StreamName="stream", ShardCount=1))
+
+        async_call(
+            kinesis.put_records(
+                StreamName="stream",
+                Records=[
+                    {"Data": b"data", "PartitionKey": "1"},
+                    {"Data": b"more data", "PartitionKey": "2"},
+                ],
+            )
+        )
+
+        span = self.memory_exporter.get_finished_spans()[-1]
+        self.assertEqual("Kinesis.PutRecords", span.name)
+        self.assertEqual(2, span.attributes["aws.batch.size"])
+        self.assertEqual(0, span.attributes["aws.batch.failed"])
+        self.assertEqual(13, span.attributes["aws.batch.bytes"])
+
+        metrics = self._get_metrics()
+        for name, expected in (
+            ("aws.batch.size", 2),
+            ("aws.batch.failed", 0),
+            ("aws.batch.bytes", 13),
+        ):
+            (point,) = metrics[name].data.data_points
+            self.assertEqual("PutRecords", point.attributes["rpc.method"])
+            self.assertEqual(expected, point.sum)
+
+    @mock_sqs
+    def test_metrics_error(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider
+        )
+        sqs = self._make_client("sqs")
+
+        with self.assertRaises(ClientError):
+            async_call(
+                sqs.send_message(QueueUrl="non-existing", MessageBody="body")
+            )
+
+        metrics = self._get_metrics()
+        (errors,) = metrics["rpc.client.errors"].data.data_points
+        self.assertEqual(1, errors.value)
+        self.assertEqual("SendMessage", errors.attributes["rpc.method"])
+        self.assertEqual(
+            "InvalidAddress",
+            errors.attributes["error.type"],
+        )
+
+    @mock_sqs
+    def test_metrics_not_sampled(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            tracer_provider=TracerProvider(sampler=ALWAYS_OFF),
+            meter_provider=self.meter_provider,
+        )
+        sqs = self._make_client("sqs")
+
+        async_call(sqs.list_queues())
+
+        self.assertEqual(0, len(self.memory_exporter.get_finished_spans()))
+        metrics = self._get_metrics()
+        (requests,) = metrics["rpc.client.requests"].data.data_points
+        self.assertEqual(1, requests.value)
+
+    @mock_sqs
+    def test_call_metadata_cache(self) -> None:
+        instrumentor = AiobotocoreInstrumentor()
+        sqs = self._make_client("sqs")
+
+        async_call(sqs.list_queues())
+        async_call(sqs.list_queues())
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(2, len(spans))
+        for span in spans:
+            self.assertEqual("SQS.ListQueues", span.name)
+        # pylint: disable=protected-access
+        self.assertEqual(
+            ["ListQueues"], list(instrumentor._call_metadata[sqs])
+        )
+
+        async_call(sqs.close())
+        del sqs
+        gc.collect()
+        self.assertEqual(0, len(instrumentor._call_metadata))
+
+    @mock_dynamodb2
+    def test_not_sampled_skips_extract_attributes(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            tracer_provider=TracerProvider(sampler=ALWAYS_OFF)
+        )
+        dynamodb = self._make_client("dynamodb")
+
+        with patch(
+            "opentelemetry.instrumentation.botocore.extensions.dynamodb"
+            "._DynamoDbExtension.extract_attributes"
+        ) as extract_attributes:
+            async_call(dynamodb.list_tables())
+
+        extract_attributes.assert_not_called()
+
     @mock_ec2
     def test_not_recording(self) -> None:
         mock_tracer = Mock()
@@ -195,6 +1079,119 @@ class TestAiobotocoreInstrumentor(TestBase):
         async_call(s3_client.list_buckets())
         self.assert_span("S3", "ListBuckets")
 
+    @mock_s3
+    def test_s3_multipart_upload(self) -> None:
+        s3_client = self._make_client("s3")
+
+        async def slow_send(**_kwargs: Any) -> None:
+            await asyncio.sleep(0.01)
+
+        # So that parts are uploaded concurrently
+        s3_client.meta.events.register_first(
+            "before-send.s3.UploadPart", slow_send
+        )
+
+        async def upload() -> None:
+            await s3_client.create_bucket(
+                Bucket="mybucket",
+                CreateBucketConfiguration={"LocationConstraint": self.region},
+            )
+            self.memory_exporter.clear()
+
+            created = await s3_client.create_multipart_upload(
+                Bucket="mybucket", Key="key"
+            )
+            upload_id = created["UploadId"]
+            bodies = (b"0" * 5 * 1024 * 1024, BytesIO(b"1" * 1024))
+            parts = await asyncio.gather(
+                *(
+                    s3_client.upload_part(
+                        Bucket="mybucket",
+                        Key="key",
+                        UploadId=upload_id,
+                        PartNumber=number,
+                        Body=body,
+                    )
+                    for number, body in enumerate(bodies, start=1)
+                )
+            )
+            await s3_client.complete_multipart_upload(
+                Bucket="mybucket",
+                Key="key",
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"ETag": part["ETag"], "PartNumber": number}
+                        for number, part in enumerate(parts, start=1)
+                    ]
+                },
+            )
+
+        async_call(upload())
+
+        spans = self.memory_exporter.get_finished_spans()
+        (upload_span,) = [
+            span for span in spans if span.name == "S3.MultipartUpload"
+        ]
+        (create_span,) = [
+            span for span in spans if span.name == "S3.CreateMultipartUpload"
+        ]
+        self.assertEqual(create_span.parent, upload_span.parent)
+        self.assertEqual(create_span.start_time, upload_span.start_time)
+        for name in ("S3.UploadPart", "S3.CompleteMultipartUpload"):
+            for span in spans:
+                if span.name == name:
+                    self.assertEqual(
+                        upload_span.context.span_id, span.parent.span_id
+                    )
+
+        attributes = upload_span.attributes
+        self.assertEqual("mybucket", attributes["aws.s3.bucket"])
+        self.assertEqual("key", attributes["aws.s3.key"])
+        self.assertEqual(2, attributes["aws.s3.upload.parts"])
+        self.assertEqual(
+            5 * 1024 * 1024 + 1024, attributes["aws.s3.upload.bytes"]
+        )
+        self.assertEqual(2, attributes["aws.s3.upload.concurrency"])
+        self.assertTrue(attributes["aws.s3.upload.completed"])
+        self.assertIn(attributes["aws.s3.upload.slowest_part_number"], (1, 2))
+        self.assertGreater(attributes["aws.s3.upload.slowest_part_ms"], 0)
+        self.assertGreater(attributes["aws.s3.upload.throughput"], 0)
+
+    @mock_s3
+    def test_s3_multipart_upload_closed_body(self) -> None:
+        AiobotocoreInstrumentor().uninstrument()
+        AiobotocoreInstrumentor().instrument(
+            meter_provider=self.meter_provider
+        )
+        s3_client = self._make_client("s3")
+        async_call(
+            s3_client.create_bucket(
+                Bucket="mybucket",
+                CreateBucketConfiguration={"LocationConstraint": self.region},
+            )
+        )
+        upload_id = async_call(
+            s3_client.create_multipart_upload(Bucket="mybucket", Key="key")
+        )["UploadId"]
+
+        body = BytesIO(b"1" * 1024)
+        body.close()
+        # The error of botocore, which reads the body
+        with self.assertRaisesRegex(ValueError, "closed file"):
+            async_call(
+                s3_client.upload_part(
+                    Bucket="mybucket",
+                    Key="key",
+                    UploadId=upload_id,
+                    PartNumber=1,
+                    Body=body,
+                )
+            )
+
+        points = self._get_metrics()["rpc.client.active_requests"].data
+        self.assertEqual([0], [point.value for point in points.data_points])
+
     @mock_s3
     def test_s3_put(self) -> None:
         s3_client = self._make_client("s3")
@@ -314,9 +1311,10 @@ class TestAiobotocoreInstrumentor(TestBase):
         async_call(kms.list_keys(Limit=21))
 
         span = self.assert_only_span()
-        self.assertEqual(
-            self._default_span_attributes("KMS", "ListKeys"), span.attributes
-        )
+        expected = self._default_span_attributes("KMS", "ListKeys")
+        # {"Limit": 21}
+        expected[SpanAttributes.HTTP_REQUEST_CONTENT_LENGTH] = 13
+        self.assertEqual(expected, span.attributes)
 
     @mock_sts
     def test_sts_client(self) -> None:
@@ -327,6 +1325,8 @@ class TestAiobotocoreInstrumentor(TestBase):
         span = self.assert_only_span()
         expected = self._default_span_attributes("STS", "GetCallerIdentity")
         expected["aws.request_id"] = "c6104cbe-af31-11e0-8154-cbc7ccf896c7"
+        # Action=GetCallerIdentity&Version=2011-06-15
+        expected[SpanAttributes.HTTP_REQUEST_CONTENT_LENGTH] = 43
         self.assertEqual(expected, span.attributes)
 
     @mock_ec2
@@ -1,18 +1,39 @@
 import aiobotocore.session  # pylint: disable=import-error
 import asyncio
+from botocore.exceptions import (
+    ParamValidationError,
+)
 from moto import (
     mock_sqs,
 )
+from opentelemetry.context import (
+    attach,
+    detach,
+    set_value,
+)
+from opentelemetry.instrumentation.botocore.extensions._messaging import (
+    inject_propagation_context,
+)
+from opentelemetry.instrumentation.utils import (
+    _SUPPRESS_INSTRUMENTATION_KEY,
+)
 from opentelemetry.semconv.trace import (
     SpanAttributes,
 )
 from opentelemetry.test.test_base import (
     TestBase,
 )
+from opentelemetry.trace import (
+    SpanKind,
+)
 from otelcontribs.instrumentation.aiobotocore import (
     AiobotocoreInstrumentor,
 )
+from otelcontribs.instrumentation.aiobotocore.sqs import (
+    iter_messages,
+)
 from typing import (
+    Any,
     Awaitable,
     TypeVar,
 )
@@ -108,6 +129,135 @@ class TestSqsExtension(TestBase):
             span.attributes[SpanAttributes.MESSAGING_MESSAGE_ID],
             response["Successful"][0]["MessageId"],
         )
+        self.assertEqual(span.attributes["aws.batch.size"], 2)
+        self.assertEqual(span.attributes["aws.batch.failed"], 0)
+        self.assertEqual(span.attributes["aws.batch.bytes"], 15)
+
+    @mock_sqs
+    def test_sqs_send_message_batch_injects_span(self) -> None:
+        queue_url = async_call(
+            self.client.create_queue(QueueName="test_queue_name")
+        )["QueueUrl"]
+        full_attributes = {
+            f"key{index}": {"DataType": "String", "StringValue": "value"}
+            for index in range(10)
+        }
+        entries: list[dict[str, Any]] = [
+            {"Id": "1", "MessageBody": "content"},
+            {
+                "Id": "2",
+                "MessageBody": "content",
+                "MessageAttributes": {
+                    "key": {"DataType": "String", "StringValue": "value"}
+                },
+            },
+            {
+                "Id": "3",
+                "MessageBody": "content",
+                "MessageAttributes": dict(full_attributes),
+            },
+        ]
+        async_call(
+            self.client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+        )
+
+        span = self.memory_exporter.get_finished_spans()[-1]
+        self.assertEqual(span.attributes["rpc.method"], "SendMessageBatch")
+        for entry in entries[:2]:
+            # traceparent: <ver>-<trace-id>-<span-id>-<flags>
+            trace_parent = entry["MessageAttributes"]["traceparent"][
+                "StringValue"
+            ].split("-")
+            self.assertEqual(span.context.trace_id, int(trace_parent[1], 16))
+            self.assertEqual(span.context.span_id, int(trace_parent[2], 16))
+        self.assertEqual(
+            entries[1]["MessageAttributes"]["key"]["StringValue"], "value"
+        )
+        self.assertEqual(entries[2]["MessageAttributes"], full_attributes)
+
+        messages = async_call(
+            self.client.receive_message(
+                QueueUrl=queue_url,
+                MaxNumberOfMessages=10,
+                MessageAttributeNames=["All"],
+            )
+        )["Messages"]
+        self.assertEqual(
+            sorted(
+                "traceparent" in message.get("MessageAttributes", {})
+                for message in messages
+            ),
+            [False, True, True],
+        )
+
+    @mock_sqs
+    def test_sqs_send_message_injects_span(self) -> None:
+        queue_url = async_call(
+            self.client.create_queue(QueueName="test_queue_name")
+        )["QueueUrl"]
+        async_call(
+            self.client.send_message(QueueUrl=queue_url, MessageBody="content")
+        )
+        span = self.memory_exporter.get_finished_spans()[-1]
+        self.assertEqual(span.attributes["rpc.method"], "SendMessage")
+
+        (message,) = async_call(
+            self.client.receive_message(
+                QueueUrl=queue_url, MessageAttributeNames=["All"]
+            )
+        )["Messages"]
+        # traceparent: <ver>-<trace-id>-<span-id>-<flags>
+        trace_parent = message["MessageAttributes"]["traceparent"][
+            "StringValue"
+        ].split("-")
+        self.assertEqual(span.context.trace_id, int(trace_parent[1], 16))
+        self.assertEqual(span.context.span_id, int(trace_parent[2], 16))
+
+    @mock_sqs
+    def test_sqs_delete_message_batch_invalid_entries(self) -> None:
+        queue_url = async_call(
+            self.client.create_queue(QueueName="test_queue_name")
+        )["QueueUrl"]
+        with self.assertRaises(ParamValidationError):
+            async_call(
+                self.client.delete_message_batch(QueueUrl=queue_url, Entries=5)
+            )
+
+    @mock_sqs
+    def test_sqs_send_message_batch_invalid_entries(self) -> None:
+        queue_url = async_call(
+            self.client.create_queue(QueueName="test_queue_name")
+        )["QueueUrl"]
+        for entries in (5, ["x"]):
+            with self.subTest(entries=entries), self.assertRaises(
+                ParamValidationError
+            ):
+                async_call(
+                    self.client.send_message_batch(
+                        QueueUrl=queue_url, Entries=entries
+                    )
+                )
+
+    @mock_sqs
+    def test_sqs_delete_message_batch_failed_entries(self) -> None:
+        create_queue_result = async_call(
+            self.client.create_queue(QueueName="test_queue_name")
+        )
+        async_call(
+            self.client.delete_message_batch(
+                QueueUrl=create_queue_result["QueueUrl"],
+                Entries=[
+                    {"Id": "1", "ReceiptHandle": "invalid-1"},
+                    {"Id": "2", "ReceiptHandle": "invalid-2"},
+                ],
+            )
+        )
+
+        span = self.memory_exporter.get_finished_spans()[-1]
+        self.assertEqual(span.attributes["rpc.method"], "DeleteMessageBatch")
+        self.assertEqual(span.attributes["aws.batch.size"], 2)
+        self.assertEqual(span.attributes["aws.batch.failed"], 2)
+        self.assertNotIn("aws.batch.bytes", span.attributes)
 
     @mock_sqs
     def test_sqs_messaging_receive_message(self) -> None:
@@ -144,6 +294,122 @@ class TestSqsExtension(TestBase):
             message_result["Messages"][0]["MessageId"],
         )
 
+    @mock_sqs
+    def test_sqs_iter_messages(self) -> None:
+        queue_url = async_call(
+            self.client.create_queue(QueueName="test_queue_name")
+        )["QueueUrl"]
+        tracer = self.tracer_provider.get_tracer("test")
+        with tracer.start_as_current_span("producer") as producer:
+            # A producer propagating its own context, not the send span's
+            token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
+            try:
+                async_call(
+                    self.client.send_message(
+                        QueueUrl=queue_url,
+                        MessageBody="content",
+                        MessageAttributes=inject_propagation_context({}),
+                    )
+                )
+            finally:
+                detach(token)
+        self.memory_exporter.clear()
+
+        async def consume() -> list[tuple[dict[str, Any], Any]]:
+            processed = []
+            async for message in iter_messages(
+                self.client,
+                queue_url,
+                tracer_provider=self.tracer_provider,
+                meter_provider=self.meter_provider,
+                stop_when_empty=True,
+            ):
+                with tracer.start_as_current_span("handle") as handle:
+                    processed.append((message, handle))
+            return processed
+
+        ((message, handle),) = async_call(consume())
+
+        spans = {
+            span.name: span
+            for span in self.memory_exporter.get_finished_spans()
+        }
+        span = spans["test_queue_name process"]
+        self.assertIs(span.kind, SpanKind.CONSUMER)
+        self.assertEqual(handle.parent.span_id, span.context.span_id)
+        self.assertIsNone(span.parent)
+        self.assertEqual(
+            [link.context.span_id for link in span.links],
+            [producer.get_span_context().span_id],
+        )
+        self.assertEqual(
+            span.attributes[SpanAttributes.MESSAGING_OPERATION], "process"
+        )
+        self.assertEqual(
+            span.attributes[SpanAttributes.MESSAGING_MESSAGE_ID],
+            message["MessageId"],
+        )
+
+        (metric,) = [
+            metric
+            for metric in self.get_sorted_metrics()
+            if metric.name == "messaging.sqs.queue_lag"
+        ]
+        (point,) = metric.data.data_points
+        self.assertEqual(point.count, 1)
+        self.assertGreaterEqual(point.min, 0)
+        self.assertEqual(
+            point.attributes[SpanAttributes.MESSAGING_DESTINATION],
+            "test_queue_name",
+        )
+
+    @mock_sqs
+    def test_sqs_iter_messages_aws_trace_header(self) -> None:
+        queue_url = async_call(
+            self.client.create_queue(QueueName="test_queue_name")
+        )["QueueUrl"]
+        # Set by SQS from the X-Ray header, without any message attribute
+        token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
+        try:
+            async_call(
+                self.client.send_message(
+                    QueueUrl=queue_url,
+                    MessageBody="content",
+                    MessageSystemAttributes={
+                        "AWSTraceHeader": {
+                            "DataType": "String",
+                            "StringValue": "Root=1-5759e988-bd862e3fe1be46a9"
+                            "94272793;Parent=53995c3f42cd8ad8;Sampled=1",
+                        }
+                    },
+                )
+            )
+        finally:
+            detach(token)
+
+        async def consume() -> None:
+            async for _message in iter_messages(
+                self.client,
+                queue_url,
+                tracer_provider=self.tracer_provider,
+                stop_when_empty=True,
+            ):
+                pass
+
+        async_call(consume())
+
+        (span,) = [
+            span
+            for span in self.memory_exporter.get_finished_spans()
+            if span.name == "test_queue_name process"
+        ]
+        (link,) = span.links
+        self.assertEqual(
+            0x5759E988BD862E3FE1BE46A994272793, link.context.trace_id
+        )
+        self.assertEqual(0x53995C3F42CD8AD8, link.context.span_id)
+        self.assertTrue(link.context.trace_flags.sampled)
+
     @mock_sqs
     def test_sqs_messaging_failed_operation(self) -> None:
         with self.assertRaises(Exception):
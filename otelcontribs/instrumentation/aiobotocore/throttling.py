@@ -0,0 +1,79 @@
+from botocore.retries.standard import (
+    ThrottledRetryableChecker,
+)
+from collections import (
+    deque,
+)
+from threading import (
+    Lock,
+)
+from time import (
+    monotonic,
+)
+from typing import (
+    Any,
+)
+
+_THROTTLING_ERROR_CODES = frozenset(
+    # pylint: disable=protected-access
+    ThrottledRetryableChecker._THROTTLED_ERROR_CODES
+)
+
+# Request parameters naming the resource a call is throttled on
+_RESOURCE_PARAMS = ("TableName", "QueueUrl", "StreamName")
+
+_ThrottleKey = tuple[str, str, str | None]
+
+
+class _Throttles:
+    """Sliding window counts of throttled attempts."""
+
+    __slots__ = ("window", "_events", "_lock")
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._events: dict[_ThrottleKey, deque[float]] = {}
+        # Observed from the metric reader thread
+        self._lock = Lock()
+
+    def _expire(self, events: deque[float], now: float) -> None:
+        while events and events[0] <= now - self.window:
+            events.popleft()
+
+    def add(self, key: _ThrottleKey) -> int:
+        now = monotonic()
+        with self._lock:
+            events = self._events.setdefault(key, deque())
+            events.append(now)
+            self._expire(events, now)
+            return len(events)
+
+    def count(self, key: _ThrottleKey) -> int:
+        with self._lock:
+            events = self._events.get(key)
+            if events is None:
+                return 0
+            self._expire(events, monotonic())
+            return len(events)
+
+    def counts(self) -> list[tuple[_ThrottleKey, int]]:
+        now = monotonic()
+        counts = []
+        with self._lock:
+            for key, events in list(self._events.items()):
+                self._expire(events, now)
+                if events:
+                    counts.append((key, len(events)))
+                else:
+                    del self._events[key]
+        return counts
+
+
+def _get_throttle_key(call_context: Any) -> _ThrottleKey:
+    resource = None
+    for param in _RESOURCE_PARAMS:
+        value = call_context.params.get(param)
+        if isinstance(value, str):
+            resource = value
+            break
+    return (call_context.service_id, call_context.operation, resource)
@@ -0,0 +1,100 @@
+from aiobotocore.waiter import (  # pylint: disable=import-error
+    AIOWaiter,
+)
+from botocore.exceptions import (
+    WaiterError,
+)
+from contextvars import (
+    ContextVar,
+)
+from opentelemetry.semconv.trace import (
+    SpanAttributes,
+)
+from opentelemetry.trace import (
+    SpanKind,
+    Tracer,
+)
+from timeit import (
+    default_timer,
+)
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+)
+
+# State of the waiter currently awaited
+_WAIT: ContextVar["_Wait | None"] = ContextVar(
+    "otelcontribs_aiobotocore_wait", default=None
+)
+
+
+class _Wait:
+    """State of one wait shared with the API calls polling it."""
+
+    __slots__ = ("poll_spans", "polls", "poll_time")
+
+    def __init__(self, poll_spans: bool) -> None:
+        self.poll_spans = poll_spans
+        self.polls = 0
+        self.poll_time = 0.0
+
+
+def _get_waiter_state(error: WaiterError) -> str:
+    reason = str(error.kwargs.get("reason", ""))
+    if reason.startswith("Max attempts exceeded"):
+        return "timeout"
+    if reason.startswith("Waiter encountered a terminal failure state"):
+        return "failure"
+    return "error"
+
+
+async def _traced_wait(
+    tracer: Tracer,
+    waiter: AIOWaiter,
+    poll_spans: bool,
+    wrapped: Callable[..., Coroutine],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Any:
+    """Await a wait of ``waiter`` in a ``<service>.<waiter> wait`` span.
+
+    The polls made meanwhile find the wait state in ``_WAIT``, and count
+    themselves and their time in it.
+    """
+    # pylint: disable=protected-access
+    client = waiter._operation_method._client_method.__self__
+    service_id = client.meta.service_model.service_id
+
+    wait = _Wait(poll_spans)
+    state = "success"
+    start = default_timer()
+    with tracer.start_as_current_span(
+        f"{service_id}.{waiter.name} wait",
+        kind=SpanKind.INTERNAL,
+        attributes={
+            SpanAttributes.RPC_SYSTEM: "aws-api",
+            SpanAttributes.RPC_SERVICE: service_id,
+            SpanAttributes.RPC_METHOD: waiter.config.operation,
+            "aws.waiter.name": waiter.name,
+        },
+    ) as span:
+        token = _WAIT.set(wait)
+        try:
+            return await wrapped(*args, **kwargs)
+        except WaiterError as error:
+            state = _get_waiter_state(error)
+            raise
+        except BaseException:
+            state = "error"
+            raise
+        finally:
+            _WAIT.reset(token)
+            sleep_time = default_timer() - start - wait.poll_time
+            span.set_attributes(
+                {
+                    "aws.waiter.polls": wait.polls,
+                    "aws.waiter.sleep_ms": max(sleep_time, 0.0) * 1000,
+                    "aws.waiter.state": state,
+                }
+            )
@@ -1,47 +1,17 @@
-import graphql
-from graphql import (
-    default_field_resolver,
-    DocumentNode,
-    ExecutionContext,
-    FieldNode,
-    get_operation_ast,
-    GraphQLError,
-    GraphQLField,
-    GraphQLFieldResolver,
-    GraphQLObjectType,
-    OperationDefinitionNode,
-    Source,
+from __future__ import (
+    annotations,
 )
-from graphql.execution.execute import (
-    get_field_def,
+
+from array import (
+    array,
 )
-from graphql.language.parser import (
-    SourceType,
+from contextvars import (
+    ContextVar,
 )
 import importlib
-import re
-from typing import (
-    Any,
-    Callable,
-    cast,
-    Collection,
-    Dict,
-    List,
-    Optional,
-    Tuple,
-    Union,
-)
-
-try:
-    # Faster, but only available from 3.1.0 onwards
-    from graphql.pyutils import (
-        is_awaitable,
-    )
-except ImportError:
-    from inspect import isawaitable as is_awaitable  # type: ignore
-
 from opentelemetry import (
     context,
+    trace,
 )
 from opentelemetry.context import (
     _SUPPRESS_INSTRUMENTATION_KEY,
@@ -52,9 +22,17 @@ from opentelemetry.instrumentation.instrumentor import (  # type: ignore
 from opentelemetry.instrumentation.utils import (
     unwrap,
 )
+from opentelemetry.metrics import (
+    get_meter,
+)
 from opentelemetry.trace import (
     get_tracer,
     Span,
+    Status,
+    StatusCode,
+)
+from opentelemetry.util.types import (
+    AttributeValue,
 )
 from otelcontribs.instrumentation.graphql_core.package import (
     INSTRUMENTS,
@@ -62,12 +40,63 @@ from otelcontribs.instrumentation.graphql_core.package import (
 from otelcontribs.instrumentation.graphql_core.version import (
     VERSION,
 )
+from threading import (
+    Lock,
+)
+from time import (
+    time_ns,
+)
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
 from wrapt import (
     wrap_function_wrapper,
 )
 
-graphql_module = importlib.import_module("graphql.graphql")
-graphql_execute_module = importlib.import_module("graphql.execution.execute")
+if TYPE_CHECKING:
+    from graphql import (
+        DocumentNode,
+        ExecutionContext,
+        FieldNode,
+        GraphQLError,
+        GraphQLField,
+        GraphQLFieldResolver,
+        GraphQLObjectType,
+        OperationDefinitionNode,
+        Source,
+    )
+    from graphql.language.parser import (
+        SourceType,
+    )
+    from graphql.pyutils import (
+        Path,
+    )
+
+
+RESOLVER_MODE_SPAN = "span"
+RESOLVER_MODE_AGGREGATE = "aggregate"
+RESOLVER_MODE_THRESHOLD = "threshold"
+RESOLVER_MODE_PROFILE = "profile"
+_RESOLVER_MODES = (
+    RESOLVER_MODE_SPAN,
+    RESOLVER_MODE_AGGREGATE,
+    RESOLVER_MODE_THRESHOLD,
+    RESOLVER_MODE_PROFILE,
+)
+PROFILE_FORMAT_COLLAPSED = "collapsed"
+PROFILE_FORMAT_TOP = "top"
 
 
 class GraphQLCoreInstrumentor(BaseInstrumentor):
@@ -78,6 +107,10 @@ class GraphQLCoreInstrumentor(BaseInstrumentor):
         self._tracer = get_tracer(__name__, VERSION)
         self.skip_default_resolvers = False
         self.skip_introspection_query = False
+        self.include_field_path = False
+        self.detach_leaf_spans = False
+        self.resolver_mode = RESOLVER_MODE_SPAN
+        self.resolver_threshold_ms = 100.0
 
     def instrumentation_dependencies(self) -> Collection[str]:
         return INSTRUMENTS
@@ -92,45 +125,68 @@ class GraphQLCoreInstrumentor(BaseInstrumentor):
         self.skip_introspection_query = kwargs.get(
             "skip_introspection_query", True
         )
+        self.include_field_path = kwargs.get("include_field_path", False)
+        self.detach_leaf_spans = kwargs.get("detach_leaf_spans", False)
+        self.resolver_mode = kwargs.get("resolver_mode", RESOLVER_MODE_SPAN)
+        if self.resolver_mode not in _RESOLVER_MODES:
+            raise ValueError(f"Invalid resolver_mode: {self.resolver_mode}")
+        self.resolver_threshold_ms = kwargs.get("resolver_threshold_ms", 100.0)
+        meter = get_meter(__name__, VERSION, kwargs.get("meter_provider"))
+        # pylint: disable=attribute-defined-outside-init
+        self._resolve_duration = meter.create_histogram(
+            "graphql.resolve.duration",
+            unit="ms",
+            description="Duration of GraphQL field resolutions",
+        )
+
+        # Used for every field, so imported once rather than where used
+        (
+            self._default_field_resolver,
+            self._get_field_def,
+            self._is_awaitable,
+        ) = _import_graphql()
 
         wrap_function_wrapper(
-            graphql,
+            "graphql",
             "parse",
             self._patched_parse,
         )
         wrap_function_wrapper(
-            graphql_module,
+            "graphql.graphql",
             "parse",
             self._patched_parse,
         )
         wrap_function_wrapper(
-            graphql.validation,
+            "graphql.validation",
             "validate",
             self._patched_validate,
         )
         wrap_function_wrapper(
-            graphql,
+            "graphql",
             "execute",
             self._patched_execute,
         )
         wrap_function_wrapper(
-            graphql_module,
+            "graphql.graphql",
             "execute",
             self._patched_execute,
         )
         wrap_function_wrapper(
-            graphql,
+            "graphql",
             "ExecutionContext.execute_field",
             self._patched_execute_field,
         )
 
     def _uninstrument(self, **_kwargs: Any) -> None:
+        graphql = importlib.import_module("graphql")
+        graphql_module = importlib.import_module("graphql.graphql")
+
         unwrap(graphql, "parse")
         unwrap(graphql_module, "parse")
         unwrap(graphql.validation, "validate")
         unwrap(graphql, "execute")
         unwrap(graphql_module, "execute")
-        unwrap(ExecutionContext, "execute_field")
+        unwrap(graphql.ExecutionContext, "execute_field")
 
     def _patched_parse(
         self,
@@ -179,20 +235,40 @@ class GraphQLCoreInstrumentor(BaseInstrumentor):
         with self._tracer.start_as_current_span("graphql.execute") as span:
             document_arg: DocumentNode = args[1]
             _set_operation_attrs(span, document_arg)
-            result = original_func(*args, **kwargs)
 
-            if is_awaitable(result):
+            timings = None
+            if self.resolver_mode != RESOLVER_MODE_SPAN:
+                timings = _ResolverTimings()
+                token = _RESOLVER_TIMINGS.set(timings)
+                try:
+                    result = original_func(*args, **kwargs)
+                finally:
+                    _RESOLVER_TIMINGS.reset(token)
+            else:
+                result = original_func(*args, **kwargs)
+
+            if self._is_awaitable(result):
 
                 async def await_result() -> Any:
                     with self._tracer.start_as_current_span(
                         "graphql.execute.await"
                     ) as span:
                         _set_operation_attrs(span, document_arg)
-                        async_result = await result
+                        if timings is None:
+                            async_result = await result
+                        else:
+                            token = _RESOLVER_TIMINGS.set(timings)
+                            try:
+                                async_result = await result
+                            finally:
+                                _RESOLVER_TIMINGS.reset(token)
+                                self._finalize_timings(span, timings)
                         _set_errors(span, async_result.errors)
                         return async_result
 
                 return await_result()
+            if timings is not None:
+                self._finalize_timings(span, timings)
             _set_errors(span, result.errors)
             return result
 
@@ -209,34 +285,403 @@ class GraphQLCoreInstrumentor(BaseInstrumentor):
         parent_type_arg: GraphQLObjectType = args[0]
         field_nodes_arg: List[FieldNode] = args[2]
         field_node = field_nodes_arg[0]
-        field = get_field_def(instance.schema, parent_type_arg, field_node)
+        field = self._get_field_def(
+            instance.schema, parent_type_arg, field_node
+        )
 
         if _should_skip_field(
             field,
             instance.operation,
+            self._default_field_resolver,
             self.skip_default_resolvers,
             self.skip_introspection_query,
         ):
             return original_func(*args, **kwargs)
 
-        with self._tracer.start_as_current_span("graphql.resolve") as span:
-            _set_field_attrs(span, field_node)
+        timings = _RESOLVER_TIMINGS.get()
+        if timings is not None:
+            return _execute_field_timed(
+                original_func,
+                instance,
+                args,
+                kwargs,
+                timings,
+                self._is_awaitable,
+            )
+
+        attributes, is_leaf = _get_field_info(
+            parent_type_arg, field, field_node
+        )
+        if self.include_field_path:
+            path_arg: Path = args[3]
+            attributes = {
+                **attributes,
+                "graphql.field.path": _format_path(path_arg),
+            }
+
+        if is_leaf and self.detach_leaf_spans:
+            return self._execute_leaf_field(
+                original_func, args, kwargs, attributes
+            )
+
+        with self._tracer.start_as_current_span(
+            "graphql.resolve", attributes=attributes
+        ):
             result = original_func(*args, **kwargs)
 
-            if is_awaitable(result):
+            if self._is_awaitable(result):
 
                 async def await_result() -> Any:
                     with self._tracer.start_as_current_span(
-                        "graphql.resolve.await"
-                    ) as span:
-                        _set_field_attrs(span, field_node)
+                        "graphql.resolve.await", attributes=attributes
+                    ):
                         return await result
 
                 return await_result()
             return result
 
+    def _execute_leaf_field(
+        self,
+        original_func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        attributes: Dict[str, AttributeValue],
+    ) -> Any:
+        # Leaf fields have no subfields to resolve, so their span is parented
+        # to the current one without being attached to the context
+        span = self._tracer.start_span(
+            "graphql.resolve", attributes=attributes
+        )
+        try:
+            result = original_func(*args, **kwargs)
+        except Exception as exception:
+            span.record_exception(exception)
+            span.set_status(
+                Status(
+                    StatusCode.ERROR,
+                    f"{type(exception).__name__}: {exception}",
+                )
+            )
+            raise
+        finally:
+            span.end()
+
+        if self._is_awaitable(result):
+
+            async def await_result() -> Any:
+                with self._tracer.start_as_current_span(
+                    "graphql.resolve.await", attributes=attributes
+                ):
+                    return await result
+
+            return await_result()
+        return result
+
+    def _finalize_timings(self, span: Span, timings: _ResolverTimings) -> None:
+        if self.resolver_mode == RESOLVER_MODE_AGGREGATE:
+            for path_id, start, end, error in timings.records():
+                self._resolve_duration.record(
+                    (end - start) / 1e6,
+                    {
+                        "graphql.field.path": _FIELD_PATHS.name(path_id),
+                        "graphql.field.error": error,
+                    },
+                )
+        elif self.resolver_mode == RESOLVER_MODE_THRESHOLD:
+            parent = trace.set_span_in_context(span)
+            threshold_ns = int(self.resolver_threshold_ms * 1e6)
+            for path_id, start, end, error in timings.records():
+                if end - start < threshold_ns:
+                    continue
+
+                path = _FIELD_PATHS.patterns[path_id]
+                field_span = self._tracer.start_span(
+                    "graphql.resolve",
+                    context=parent,
+                    attributes={
+                        "graphql.field.name": path[-1],
+                        "graphql.field.path": ".".join(path),
+                    },
+                    start_time=start,
+                )
+                if error:
+                    field_span.set_status(Status(StatusCode.ERROR))
+                field_span.end(end_time=end)
+        elif self.resolver_mode == RESOLVER_MODE_PROFILE:
+            _PROFILE.add(timings)
+
+    def dump_profile(
+        self, file: TextIO, output_format: str = PROFILE_FORMAT_COLLAPSED
+    ) -> None:
+        """Writes the resolver profile accumulated in "profile" mode.
+
+        "collapsed" writes one `field;subfield <self time in us>` line per
+        field path, starting at the root field and without list indices, as
+        consumed by flamegraph.pl and speedscope. "top" writes a pprof -top
+        like table of self and cumulative times.
+        """
+        if output_format == PROFILE_FORMAT_COLLAPSED:
+            _PROFILE.write_collapsed(file)
+        elif output_format == PROFILE_FORMAT_TOP:
+            _PROFILE.write_top(file)
+        else:
+            raise ValueError(f"Invalid profile format: {output_format}")
+
+    def reset_profile(self) -> None:
+        _PROFILE.clear()
+
+
+class _FieldPaths:
+    """Interns field path patterns (list indices removed) to integer ids."""
+
+    __slots__ = ("children", "parents", "patterns", "_lock")
+
+    def __init__(self) -> None:
+        self.children: Dict[Tuple[int, str], int] = {}
+        self.parents: List[int] = []
+        self.patterns: List[Tuple[str, ...]] = []
+        self._lock = Lock()
+
+    def intern(self, path: Path, memo: Dict[int, int]) -> int:
+        path_id = memo.get(id(path))
+        if path_id is not None:
+            return path_id
+
+        parent = path.prev
+        while parent is not None and parent.key.__class__ is int:
+            parent = parent.prev
+        parent_id = -1 if parent is None else self.intern(parent, memo)
+
+        key = (parent_id, cast(str, path.key))
+        path_id = self.children.get(key)
+        if path_id is None:
+            with self._lock:
+                path_id = self.children.get(key)
+                if path_id is None:
+                    prefix = () if parent_id < 0 else self.patterns[parent_id]
+                    path_id = len(self.patterns)
+                    self.patterns.append((*prefix, key[1]))
+                    self.parents.append(parent_id)
+                    self.children[key] = path_id
+
+        memo[id(path)] = path_id
+        return path_id
+
+    def name(self, path_id: int) -> str:
+        return ".".join(self.patterns[path_id])
+
+
+class _ResolverTimings:
+    """Per-execution buffer of field resolution timings.
+
+    Paths are interned lazily when the buffer is read, so recording a field
+    only costs a few appends.
+    """
+
+    __slots__ = ("paths", "starts", "ends", "errors")
+
+    def __init__(self) -> None:
+        self.paths: List[Path] = []
+        self.starts = array("q")
+        self.ends = array("q")
+        self.errors: Set[int] = set()
+
+    def start(self, path: Path) -> int:
+        index = len(self.paths)
+        self.paths.append(path)
+        self.ends.append(0)
+        self.starts.append(time_ns())
+        return index
+
+    def end(self, index: int, error: bool) -> None:
+        self.ends[index] = time_ns()
+        if error:
+            self.errors.add(index)
+
+    def records(self) -> Iterator[Tuple[int, int, int, bool]]:
+        """Yields (path id, start ns, end ns, error) for each field.
+
+        Fields still pending when the execution ended, such as those cut
+        short by the error of a non-null sibling, are left out.
+        """
+        memo: Dict[int, int] = {}
+        intern = _FIELD_PATHS.intern
+        starts = self.starts
+        ends = self.ends
+        errors = self.errors
+        for index, path in enumerate(self.paths):
+            end = ends[index]
+            if not end:
+                continue
+            error = index in errors
+            yield intern(path, memo), starts[index], end, error
+
+
+class _ResolverProfile:
+    """Cumulative and self time per field path across executions."""
+
+    __slots__ = ("calls", "total_ns", "self_ns", "_lock")
+
+    def __init__(self) -> None:
+        self.calls: Dict[int, int] = {}
+        self.total_ns: Dict[int, int] = {}
+        self.self_ns: Dict[int, int] = {}
+        self._lock = Lock()
+
+    def add(self, timings: _ResolverTimings) -> None:
+        records = list(timings.records())
+        timed = {path_id for path_id, _, _, _ in records}
+        parents = _FIELD_PATHS.parents
+
+        with self._lock:
+            for path_id, start, end, _ in records:
+                duration = end - start
+                self.calls[path_id] = self.calls.get(path_id, 0) + 1
+                self.total_ns[path_id] = (
+                    self.total_ns.get(path_id, 0) + duration
+                )
+                self.self_ns[path_id] = self.self_ns.get(path_id, 0) + duration
+
+                # Nested resolutions run within their parent's, so their
+                # time is not part of the nearest timed ancestor's self time
+                parent_id = parents[path_id]
+                while parent_id >= 0 and parent_id not in timed:
+                    parent_id = parents[parent_id]
+                if parent_id >= 0:
+                    self.self_ns[parent_id] = (
+                        self.self_ns.get(parent_id, 0) - duration
+                    )
+
+    def clear(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.total_ns.clear()
+            self.self_ns.clear()
+
+    def write_collapsed(self, file: TextIO) -> None:
+        with self._lock:
+            self_ns = dict(self.self_ns)
+
+        patterns = _FIELD_PATHS.patterns
+        for path_id, value in sorted(
+            self_ns.items(), key=lambda item: patterns[item[0]]
+        ):
+            micros = max(value, 0) // 1000
+            if micros:
+                file.write(f"{';'.join(patterns[path_id])} {micros}\n")
+
+    def write_top(self, file: TextIO) -> None:
+        with self._lock:
+            calls = dict(self.calls)
+            total_ns = dict(self.total_ns)
+            self_ns = {
+                path_id: max(value, 0)
+                for path_id, value in self.self_ns.items()
+            }
+
+        overall = sum(self_ns.values()) or 1
+        file.write(
+            f"{'flat':>12} {'flat%':>7} {'cum':>12} {'cum%':>7} "
+            f"{'calls':>8}  path\n"
+        )
+        for path_id in sorted(self_ns, key=self_ns.__getitem__, reverse=True):
+            file.write(
+                f"{self_ns[path_id] / 1e6:>10.3f}ms "
+                f"{self_ns[path_id] / overall:>7.2%} "
+                f"{total_ns[path_id] / 1e6:>10.3f}ms "
+                f"{total_ns[path_id] / overall:>7.2%} "
+                f"{calls[path_id]:>8}  {_FIELD_PATHS.name(path_id)}\n"
+            )
+
+
+_FIELD_PATHS = _FieldPaths()
+_PROFILE = _ResolverProfile()
+_RESOLVER_TIMINGS: ContextVar[Optional[_ResolverTimings]] = ContextVar(
+    "otelcontribs_graphql_resolver_timings", default=None
+)
+
+
+def _execute_field_timed(
+    original_func: Callable[..., Any],
+    instance: ExecutionContext,
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+    timings: _ResolverTimings,
+    is_awaitable: Callable[[Any], bool],
+) -> Any:
+    path: Path = args[3]
+    errors_count = len(instance.errors)
+    index = timings.start(path)
+    try:
+        result = original_func(*args, **kwargs)
+    except Exception:
+        timings.end(index, True)
+        raise
+
+    if is_awaitable(result):
+
+        async def await_result() -> Any:
+            try:
+                awaited = await result
+            except Exception:
+                timings.end(index, True)
+                raise
+            timings.end(index, _has_field_error(instance, errors_count, path))
+            return awaited
+
+        return await_result()
+
+    timings.end(index, _has_field_error(instance, errors_count, path))
+    return result
+
+
+def _has_field_error(
+    instance: ExecutionContext, errors_count: int, path: Path
+) -> bool:
+    errors = instance.errors
+    if len(errors) == errors_count:
+        return False
+
+    path_list = path.as_list()
+    return any(error.path == path_list for error in errors[errors_count:])
+
+
+def _import_graphql() -> Tuple[
+    GraphQLFieldResolver,
+    Callable[..., GraphQLField],
+    Callable[[Any], bool],
+]:
+    """Returns the default resolver, get_field_def and is_awaitable.
+
+    Imported when the instrumentation is enabled so that importing this
+    module does not import graphql-core.
+    """
+    # pylint: disable=import-outside-toplevel
+    from graphql import (
+        default_field_resolver,
+    )
+    from graphql.execution.execute import (
+        get_field_def,
+    )
+
+    try:
+        # Faster, but only available from 3.1.0 onwards
+        from graphql.pyutils import (
+            is_awaitable,
+        )
+    except ImportError:
+        from inspect import isawaitable as is_awaitable  # type: ignore
+
+    return default_field_resolver, get_field_def, is_awaitable
+
 
 def _format_source(obj: Union[DocumentNode, Source, str]) -> str:
+    # pylint: disable=import-outside-toplevel
+    from graphql import (
+        DocumentNode,
+        Source,
+    )
+
     if isinstance(obj, str):
         value = obj
     elif isinstance(obj, Source):
@@ -246,7 +691,7 @@ def _format_source(obj: Union[DocumentNode, Source, str]) -> str:
     else:
         value = ""
 
-    return re.sub(r"\s+", " ", value).strip()
+    return " ".join(value.split())
 
 
 def _set_document_attr(
@@ -257,6 +702,11 @@ def _set_document_attr(
 
 
 def _set_operation_attrs(span: Span, document: DocumentNode) -> None:
+    # pylint: disable=import-outside-toplevel
+    from graphql import (
+        get_operation_ast,
+    )
+
     _set_document_attr(span, document)
 
     operation_definition = get_operation_ast(document)
@@ -280,11 +730,45 @@ def _set_errors(span: Span, errors: Optional[List[GraphQLError]]) -> None:
             span.record_exception(error)
 
 
-def _set_field_attrs(span: Span, field_node: FieldNode) -> None:
-    span.set_attribute("graphql.field.name", field_node.name.value)
+def _get_field_info(
+    parent_type: GraphQLObjectType, field: GraphQLField, field_node: FieldNode
+) -> Tuple[Dict[str, AttributeValue], bool]:
+    """Returns the span attributes of a field and whether it is a leaf."""
+    # Cached on the type itself so it lives as long as the schema does
+    cache: Optional[Dict[str, Tuple[Dict[str, AttributeValue], bool]]] = (
+        getattr(parent_type, "_otel_field_info", None)
+    )
+    if cache is None:
+        cache = {}
+        setattr(parent_type, "_otel_field_info", cache)
+
+    field_name = field_node.name.value
+    info = cache.get(field_name)
+    if info is None:
+        # pylint: disable=import-outside-toplevel
+        from graphql import (
+            get_named_type,
+            is_leaf_type,
+        )
+
+        attributes: Dict[str, AttributeValue] = {
+            "graphql.field.name": field_name,
+            "graphql.field.parent_type": parent_type.name,
+            "graphql.field.type": str(field.type),
+        }
+        info = (attributes, is_leaf_type(get_named_type(field.type)))
+        cache[field_name] = info
+    return info
 
 
-def _is_default_resolver(resolver: Optional[GraphQLFieldResolver]) -> bool:
+def _format_path(path: Path) -> str:
+    return ".".join(str(key) for key in path.as_list())
+
+
+def _is_default_resolver(
+    resolver: Optional[GraphQLFieldResolver],
+    default_field_resolver: GraphQLFieldResolver,
+) -> bool:
     # pylint: disable=comparison-with-callable
     return (
         # graphql-core
@@ -301,7 +785,7 @@ def _is_introspection_query(operation: OperationDefinitionNode) -> bool:
     selections = operation.selection_set.selections
 
     if selections:
-        root_field = cast(FieldNode, selections[0])
+        root_field = cast("FieldNode", selections[0])
         return root_field.name.value == "__schema"
     return False
 
@@ -309,10 +793,11 @@ def _is_introspection_query(operation: OperationDefinitionNode) -> bool:
 def _should_skip_field(
     field: GraphQLField,
     operation: OperationDefinitionNode,
+    default_field_resolver: GraphQLFieldResolver,
     skip_default_resolvers: bool,
     skip_introspection_query: bool,
 ) -> bool:
-    if _is_default_resolver(field.resolve):
+    if _is_default_resolver(field.resolve, default_field_resolver):
         return skip_default_resolvers
 
     if _is_introspection_query(operation):
@@ -3,6 +3,8 @@ from graphql import (
     graphql,
     graphql_sync,
     GraphQLField,
+    GraphQLList,
+    GraphQLNonNull,
     GraphQLObjectType,
     GraphQLSchema,
     GraphQLString,
@@ -10,13 +12,22 @@ from graphql import (
 from graphql.type.definition import (
     GraphQLResolveInfo,
 )
+import io
 from opentelemetry.test.test_base import (
     TestBase,
 )
+from opentelemetry.trace import (
+    get_current_span,
+    Span,
+)
 from otelcontribs.instrumentation.graphql_core import (
     GraphQLCoreInstrumentor,
 )
+import subprocess
+import sys
+import time
 from typing import (
+    Any,
     Awaitable,
     TypeVar,
 )
@@ -151,6 +162,14 @@ class TestGraphQLCoreInstrumentor(TestBase):
         self.assertEqual(
             "hello", resolve_span.attributes["graphql.field.name"]
         )
+        self.assertEqual(
+            "RootQueryType",
+            resolve_span.attributes["graphql.field.parent_type"],
+        )
+        self.assertEqual(
+            "String", resolve_span.attributes["graphql.field.type"]
+        )
+        self.assertNotIn("graphql.field.path", resolve_span.attributes)
 
         execute_span = spans[3]
         self.assertEqual("graphql.execute", execute_span.name)
@@ -163,3 +182,317 @@ class TestGraphQLCoreInstrumentor(TestBase):
         self.assertEqual(
             "Test", execute_span.attributes["graphql.operation.name"]
         )
+
+    def test_import_does_not_import_graphql(self) -> None:
+        # -X importtime reports every module imported, with its cost in us
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                "import otelcontribs.instrumentation.graphql_core",
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        imported = [
+            line.rsplit("|", 1)[-1].strip()
+            for line in process.stderr.splitlines()
+            if line.startswith("import time:")
+        ]
+
+        self.assertIn("otelcontribs.instrumentation.graphql_core", imported)
+        self.assertEqual(
+            [],
+            [
+                module
+                for module in imported
+                if module == "graphql" or module.startswith("graphql.")
+            ],
+        )
+
+    def test_helpers_work_before_instrument(self) -> None:
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "from graphql import Source\n"
+                "from otelcontribs.instrumentation.graphql_core import (\n"
+                "    _format_source,\n"
+                ")\n"
+                "print(_format_source(Source('query  {\\n  a }')))",
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+
+        self.assertEqual("query { a }\n", process.stdout)
+
+    def test_graphql_include_field_path(self) -> None:
+        GraphQLCoreInstrumentor().uninstrument()
+        GraphQLCoreInstrumentor().instrument(include_field_path=True)
+
+        def resolve_users(
+            _parent: None, _info: GraphQLResolveInfo
+        ) -> list[dict[str, Any]]:
+            return [{}, {}]
+
+        def resolve_name(
+            _parent: dict[str, Any], _info: GraphQLResolveInfo
+        ) -> str:
+            return "John"
+
+        user_type = GraphQLObjectType(
+            name="User",
+            fields={"name": GraphQLField(GraphQLString, resolve=resolve_name)},
+        )
+        schema = GraphQLSchema(
+            query=GraphQLObjectType(
+                name="RootQueryType",
+                fields={
+                    "users": GraphQLField(
+                        GraphQLList(user_type), resolve=resolve_users
+                    )
+                },
+            )
+        )
+
+        result = graphql_sync(schema, "query Test { users { name } }")
+        self.assertEqual(result.errors, None)
+
+        spans = self.memory_exporter.get_finished_spans()
+        resolve_spans = [
+            span for span in spans if span.name == "graphql.resolve"
+        ]
+        self.assertEqual(
+            ["users.0.name", "users.1.name", "users"],
+            [span.attributes["graphql.field.path"] for span in resolve_spans],
+        )
+        self.assertEqual(
+            "[User]", resolve_spans[2].attributes["graphql.field.type"]
+        )
+        self.assertEqual(
+            "User", resolve_spans[0].attributes["graphql.field.parent_type"]
+        )
+
+    def test_graphql_detach_leaf_spans(self) -> None:
+        GraphQLCoreInstrumentor().uninstrument()
+        GraphQLCoreInstrumentor().instrument(detach_leaf_spans=True)
+        current_spans: dict[str, Span] = {}
+
+        def resolve_user(
+            _parent: None, _info: GraphQLResolveInfo
+        ) -> dict[str, Any]:
+            current_spans["user"] = get_current_span()
+            return {}
+
+        def resolve_name(
+            _parent: dict[str, Any], _info: GraphQLResolveInfo
+        ) -> str:
+            current_spans["name"] = get_current_span()
+            return "John"
+
+        user_type = GraphQLObjectType(
+            name="User",
+            fields={"name": GraphQLField(GraphQLString, resolve=resolve_name)},
+        )
+        schema = GraphQLSchema(
+            query=GraphQLObjectType(
+                name="RootQueryType",
+                fields={"user": GraphQLField(user_type, resolve=resolve_user)},
+            )
+        )
+
+        result = graphql_sync(schema, "query Test { user { name } }")
+        self.assertEqual(result.errors, None)
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(5, len(spans))
+
+        name_span, user_span = spans[2], spans[3]
+        self.assertEqual("name", name_span.attributes["graphql.field.name"])
+        self.assertEqual("user", user_span.attributes["graphql.field.name"])
+        self.assertEqual(user_span.context.span_id, name_span.parent.span_id)
+        self.assertIs(current_spans["user"], current_spans["name"])
+        self.assertEqual(
+            user_span.context.span_id,
+            current_spans["name"].get_span_context().span_id,
+        )
+
+    def test_graphql_resolver_mode_aggregate(self) -> None:
+        GraphQLCoreInstrumentor().uninstrument()
+        GraphQLCoreInstrumentor().instrument(
+            resolver_mode="aggregate", meter_provider=self.meter_provider
+        )
+
+        async def resolve_hello(
+            _parent: None, _info: GraphQLResolveInfo
+        ) -> str:
+            await asyncio.sleep(0)
+            return "Hello world!"
+
+        schema = GraphQLSchema(
+            query=GraphQLObjectType(
+                name="RootQueryType",
+                fields={
+                    "hello": GraphQLField(GraphQLString, resolve=resolve_hello)
+                },
+            )
+        )
+
+        result = async_call(graphql(schema, "query Test { hello }"))
+        self.assertEqual(result.errors, None)
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(
+            [
+                "graphql.parse",
+                "graphql.validate",
+                "graphql.execute",
+                "graphql.execute.await",
+            ],
+            [span.name for span in spans],
+        )
+
+        metrics = self.get_sorted_metrics()
+        self.assertEqual(1, len(metrics))
+        self.assertEqual("graphql.resolve.duration", metrics[0].name)
+        data_points = list(metrics[0].data.data_points)
+        self.assertEqual(1, len(data_points))
+        self.assertEqual(1, data_points[0].count)
+        self.assertEqual(
+            {"graphql.field.path": "hello", "graphql.field.error": False},
+            dict(data_points[0].attributes),
+        )
+
+    def test_graphql_resolver_mode_profile_pending_field(self) -> None:
+        GraphQLCoreInstrumentor().uninstrument()
+        instrumentor = GraphQLCoreInstrumentor()
+        instrumentor.instrument(resolver_mode="profile")
+        instrumentor.reset_profile()
+
+        async def resolve_failing(
+            _parent: None, _info: GraphQLResolveInfo
+        ) -> str:
+            raise ValueError("failing")
+
+        async def resolve_slow(
+            _parent: None, _info: GraphQLResolveInfo
+        ) -> str:
+            await asyncio.sleep(0.01)
+            return "slow"
+
+        schema = GraphQLSchema(
+            query=GraphQLObjectType(
+                name="RootQueryType",
+                fields={
+                    "a": GraphQLField(
+                        GraphQLNonNull(GraphQLString), resolve=resolve_failing
+                    ),
+                    "b": GraphQLField(GraphQLString, resolve=resolve_slow),
+                },
+            )
+        )
+
+        # The error of "a" ends the execution while "b" is still pending
+        result = async_call(graphql(schema, "query Test { a b }"))
+        self.assertEqual(1, len(result.errors or ()))
+
+        top = io.StringIO()
+        instrumentor.dump_profile(top, "top")
+        lines = top.getvalue().splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[1].endswith(" a"))
+
+    def test_graphql_resolver_mode_threshold(self) -> None:
+        GraphQLCoreInstrumentor().uninstrument()
+        GraphQLCoreInstrumentor().instrument(
+            resolver_mode="threshold", resolver_threshold_ms=5
+        )
+
+        def resolve_fast(_parent: None, _info: GraphQLResolveInfo) -> str:
+            return "fast"
+
+        def resolve_slow(_parent: None, _info: GraphQLResolveInfo) -> str:
+            time.sleep(0.01)
+            return "slow"
+
+        schema = GraphQLSchema(
+            query=GraphQLObjectType(
+                name="RootQueryType",
+                fields={
+                    "fast": GraphQLField(GraphQLString, resolve=resolve_fast),
+                    "slow": GraphQLField(GraphQLString, resolve=resolve_slow),
+                },
+            )
+        )
+
+        result = graphql_sync(schema, "query Test { fast slow }")
+        self.assertEqual(result.errors, None)
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(4, len(spans))
+
+        resolve_span, execute_span = spans[2], spans[3]
+        self.assertEqual("graphql.resolve", resolve_span.name)
+        self.assertEqual("slow", resolve_span.attributes["graphql.field.name"])
+        self.assertEqual(
+            execute_span.context.span_id, resolve_span.parent.span_id
+        )
+        self.assertGreaterEqual(
+            resolve_span.end_time - resolve_span.start_time, 10_000_000
+        )
+
+    def test_graphql_resolver_mode_profile(self) -> None:
+        GraphQLCoreInstrumentor().uninstrument()
+        instrumentor = GraphQLCoreInstrumentor()
+        instrumentor.instrument(resolver_mode="profile")
+        instrumentor.reset_profile()
+
+        def resolve_user(
+            _parent: None, _info: GraphQLResolveInfo
+        ) -> dict[str, Any]:
+            time.sleep(0.005)
+            return {}
+
+        def resolve_name(
+            _parent: dict[str, Any], _info: GraphQLResolveInfo
+        ) -> str:
+            time.sleep(0.005)
+            return "John"
+
+        user_type = GraphQLObjectType(
+            name="User",
+            fields={"name": GraphQLField(GraphQLString, resolve=resolve_name)},
+        )
+        schema = GraphQLSchema(
+            query=GraphQLObjectType(
+                name="RootQueryType",
+                fields={"user": GraphQLField(user_type, resolve=resolve_user)},
+            )
+        )
+
+        for _ in range(2):
+            result = graphql_sync(schema, "query Test { user { name } }")
+            self.assertEqual(result.errors, None)
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertNotIn("graphql.resolve", [span.name for span in spans])
+
+        collapsed = io.StringIO()
+        instrumentor.dump_profile(collapsed)
+        stacks = dict(
+            line.rsplit(" ", 1) for line in collapsed.getvalue().splitlines()
+        )
+        self.assertEqual({"user", "user;name"}, set(stacks))
+        self.assertGreaterEqual(int(stacks["user"]), 10_000)
+        self.assertGreaterEqual(int(stacks["user;name"]), 10_000)
+
+        top = io.StringIO()
+        instrumentor.dump_profile(top, "top")
+        lines = top.getvalue().splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertTrue(lines[1].endswith("user") or lines[2].endswith("user"))